@@ -0,0 +1,241 @@
+import os
+import sys
+import copy
+import json
+import time
+import asyncio
+import argparse
+import logging
+import tempfile
+
+from aiohttp import web
+from capture_module import PageCorpus
+from config_module import DEFAULT_CONFIG
+from metrics_module import METRICS
+
+logger = logging.getLogger(__name__)
+
+# Served for pages the corpus has no capture of, so pagination stops there
+EMPTY_RESULTS_PAGE = b'<html><body><ul class="srp-results srp-list clearfix"></ul></body></html>'
+
+
+class ReplayServer:
+    """Local stand-in for eBay search that serves a captured corpus.
+
+    Set cycle before each scrape cycle; every page is answered with its
+    latest capture from that cycle or earlier.
+    """
+
+    def __init__(self, corpus, host='127.0.0.1', port=0):
+        self.corpus = corpus
+        self.host = host
+        self.port = port
+        self.cycle = 0
+        self.requests = 0
+        self._runner = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def search(self, request):
+        self.requests += 1
+        query = request.query.get('_nkw', '').replace('+', ' ')
+        page = int(request.query.get('_pgn', '1'))
+        body = self.corpus.page(query, page, self.cycle)
+        return web.Response(body=body or EMPTY_RESULTS_PAGE, content_type='text/html', charset='utf-8')
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/sch/i.html', self.search)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Port 0 picks a free port
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+class FakeChannel:
+    """Discord channel stand-in that counts what would have been posted"""
+
+    def __init__(self, channel_id, latency=0.0):
+        self.id = channel_id
+        self.latency = latency
+        self.messages = 0
+        self.embeds = 0
+
+    async def send(self, embeds=()):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.messages += 1
+        self.embeds += len(embeds)
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process and its parse workers, or None where unsupported"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def benchmark_config(base_config, queries, overrides):
+    """Bot settings for a replay run: the corpus's queries, no pacing and no side effects"""
+    config_data = copy.deepcopy(base_config)
+    discord_config = config_data.setdefault('discord', {})
+    discord_config['channel_id'] = discord_config.get('channel_id') or 1
+    for subscription in config_data.get('subscriptions') or ():
+        subscription['channel_id'] = subscription.get('channel_id') or 1
+
+    scraping_config = config_data.setdefault('scraping', {})
+    scraping_config['search_terms'] = queries
+    scraping_config['capture_dir'] = ''
+    # The stub server is local, so eBay's rate limit does not apply
+    scraping_config['max_requests_per_second'] = 1000000
+    scraping_config.update(overrides)
+    config_data['metrics'] = dict(config_data.get('metrics', {}), enabled=False)
+    return config_data
+
+
+async def run_benchmark(corpus_dir, base_config=None, cycles=None, post_latency=0.0, overrides=None):
+    """Replay a captured corpus through the bot's monitoring cycle and return the measurements.
+
+    Scraping, parsing, deduplication, filtering, scoring, storage and
+    posting all run as in production; only eBay and Discord are replaced,
+    by a stub server and fake channels. The database lives in a temporary
+    directory so every run starts empty.
+    """
+    from config_module import Config
+    from sneaker_bot import SneakerBot
+
+    class ReplayBot(SneakerBot):
+        def get_channel(self, channel_id):
+            channel = self.fake_channels.get(channel_id)
+            if channel is None:
+                channel = self.fake_channels[channel_id] = FakeChannel(channel_id, post_latency)
+            return channel
+
+    corpus = PageCorpus(corpus_dir)
+    cycles = cycles or len(corpus.cycles)
+    server = ReplayServer(corpus)
+    await server.start()
+
+    workdir = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            config_path = os.path.join(tmp, 'config.json')
+            with open(config_path, 'w') as f:
+                json.dump(benchmark_config(base_config or DEFAULT_CONFIG, corpus.queries, overrides or {}), f)
+            bot = ReplayBot(Config(config_path))
+            bot.fake_channels = {}
+            bot.scraper.base_url = server.base_url
+            # Every term is due on every cycle
+            bot.poll_schedule.configure(0.001, 0.001, 0.001)
+            await bot.setup_hook()
+
+            scraped = METRICS.counter('sneaker_listings_scraped_total', '')
+            queued = METRICS.counter('sneaker_deals_queued_total', '')
+            scraped_before, queued_before = scraped.children[()].value, queued.children[()].value
+            latencies = []
+            try:
+                for cycle in range(cycles):
+                    server.cycle = cycle
+                    started = time.perf_counter()
+                    await bot.monitor_listings()
+                    latencies.append(time.perf_counter() - started)
+                    await asyncio.sleep(0.002)
+
+                drain_started = time.perf_counter()
+                await asyncio.gather(*(poster.stop() for poster in bot.posters.values()))
+                drain_seconds = time.perf_counter() - drain_started
+            finally:
+                await bot.close()
+        finally:
+            os.chdir(workdir)
+            await server.stop()
+
+    listings = scraped.children[()].value - scraped_before
+    elapsed = sum(latencies)
+    return {
+        'corpus_pages': len(corpus),
+        'cycles': cycles,
+        'requests': server.requests,
+        'listings': listings,
+        'deals': queued.children[()].value - queued_before,
+        'messages': sum(channel.messages for channel in bot.fake_channels.values()),
+        'listings_per_second': listings / elapsed if elapsed else 0.0,
+        'cycle_p50_ms': percentile(latencies, 0.5) * 1000,
+        'cycle_p99_ms': percentile(latencies, 0.99) * 1000,
+        'post_drain_ms': drain_seconds * 1000,
+        'peak_rss_bytes': peak_rss_bytes(),
+        'stages_ms': {
+            family.name: family.children[()].sum / family.children[()].count * 1000
+            for family in METRICS.families.values()
+            if family.name.endswith('_seconds') and () in family.children and family.children[()].count
+        },
+    }
+
+
+def print_report(results):
+    print(f"Replayed {results['corpus_pages']} captured pages over {results['cycles']} cycles "
+          f"({results['requests']} requests)")
+    print(f"Throughput:    {results['listings_per_second']:.0f} listings/s ({results['listings']} listings, "
+          f"{results['deals']} deals, {results['messages']} messages)")
+    print(f"Cycle latency: p50 {results['cycle_p50_ms']:.1f} ms, p99 {results['cycle_p99_ms']:.1f} ms")
+    print(f"Post drain:    {results['post_drain_ms']:.1f} ms")
+    if results['peak_rss_bytes'] is not None:
+        print(f"Peak RSS:      {results['peak_rss_bytes'] / 1048576:.1f} MiB")
+    print("Mean stage times:")
+    for name, mean_ms in results['stages_ms'].items():
+        print(f"  {name:<32} {mean_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Replay a captured page corpus and measure the bot's pipeline")
+    arg_parser.add_argument('corpus', help="capture directory written by scraper capture mode")
+    arg_parser.add_argument('--config', help="config.json to start from (defaults to the built-in defaults)")
+    arg_parser.add_argument('--cycles', type=int, help="cycles to run (defaults to the number captured)")
+    arg_parser.add_argument('--parser', choices=['lxml', 'html.parser'])
+    arg_parser.add_argument('--streaming', action='store_true')
+    arg_parser.add_argument('--parse-workers', type=int)
+    arg_parser.add_argument('--post-latency', type=float, default=0.0, help="seconds each fake Discord send takes")
+    arg_parser.add_argument('--json', action='store_true', help="print the results as JSON")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    base_config = None
+    if args.config:
+        with open(args.config, 'r') as f:
+            base_config = json.load(f)
+    overrides = {}
+    if args.parser:
+        overrides['parser'] = args.parser
+    if args.streaming:
+        overrides['streaming'] = True
+    if args.parse_workers is not None:
+        overrides['parse_workers'] = args.parse_workers
+
+    results = asyncio.run(run_benchmark(args.corpus, base_config, args.cycles, args.post_latency, overrides))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
@@ -0,0 +1,120 @@
+import hashlib
+import math
+import sys
+from collections import OrderedDict
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over integer keys or strings using double hashing"""
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        data = item.to_bytes(8, 'little', signed=True) if isinstance(item, int) else item.encode('utf-8')
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    @property
+    def memory_bytes(self):
+        return len(self.bits)
+
+
+class SeenCache:
+    """In-process front cache for the dedup store.
+
+    A Bloom filter answers "definitely new" without touching the database and
+    a bounded LRU holds listing keys that are confirmed to be stored, so only
+    keys the filter cannot rule out and the LRU has not confirmed reach SQLite.
+    """
+
+    def __init__(self, capacity=100000, lru_size=20000, error_rate=0.001):
+        self.lru_size = lru_size
+        self.error_rate = error_rate
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.lru = OrderedDict()
+        self.lookups = 0
+        self.lru_hits = 0
+        self.bloom_negatives = 0
+
+    @classmethod
+    def from_keys(cls, keys, capacity=100000, lru_size=20000, error_rate=0.001):
+        """Build a cache from stored listing keys, oldest first"""
+        keys = list(keys)
+        # Leave headroom so the filter keeps its error rate as the table grows
+        cache = cls(max(capacity, 2 * len(keys)), lru_size, error_rate)
+        for key in keys:
+            cache.bloom.add(key)
+        for key in keys[-lru_size:]:
+            cache.lru[key] = None
+        return cache
+
+    def _remember(self, key):
+        self.lru[key] = None
+        self.lru.move_to_end(key)
+        if len(self.lru) > self.lru_size:
+            self.lru.popitem(last=False)
+
+    def partition(self, keys):
+        """Split keys into (seen, maybe_new, new) using only in-memory state"""
+        seen, maybe_new, new = set(), [], set()
+        for key in keys:
+            self.lookups += 1
+            if key in self.lru:
+                self.lru.move_to_end(key)
+                self.lru_hits += 1
+                seen.add(key)
+            elif key not in self.bloom:
+                self.bloom_negatives += 1
+                new.add(key)
+            else:
+                maybe_new.append(key)
+        return seen, maybe_new, new
+
+    def confirm(self, keys):
+        """Mark keys the database confirmed as stored"""
+        for key in keys:
+            self._remember(key)
+
+    def add(self, keys):
+        """Track newly stored keys"""
+        for key in keys:
+            if key not in self.lru:
+                self.bloom.add(key)
+            self._remember(key)
+
+    @property
+    def memory_bytes(self):
+        lru_bytes = sys.getsizeof(self.lru) + sum(sys.getsizeof(key) for key in self.lru)
+        return self.bloom.memory_bytes + lru_bytes
+
+    def stats(self):
+        """Return hit rate and memory figures for logging"""
+        hits = self.lru_hits + self.bloom_negatives
+        return {
+            'lookups': self.lookups,
+            'lru_hits': self.lru_hits,
+            'bloom_negatives': self.bloom_negatives,
+            'db_lookups': self.lookups - hits,
+            'hit_rate': hits / self.lookups if self.lookups else 0.0,
+            'bloom_items': self.bloom.count,
+            'lru_items': len(self.lru),
+            'memory_bytes': self.memory_bytes,
+        }
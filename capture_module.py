@@ -0,0 +1,97 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+from urllib.parse import urlparse, parse_qs
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.jsonl'
+
+
+def page_request(url):
+    """Return (query, page number) of an eBay search URL"""
+    params = parse_qs(urlparse(url).query)
+    query = params.get('_nkw', [''])[0]
+    page = int(params.get('_pgn', ['1'])[0])
+    return query, page
+
+
+class PageRecorder:
+    """Saves raw search pages to a gzip fixture corpus for offline replay.
+
+    Every page is one .html.gz file; manifest.jsonl lists the query, page
+    number and scrape cycle of each so the benchmark can serve the pages
+    back in the order they were captured.
+    """
+
+    def __init__(self, capture_dir):
+        self.capture_dir = capture_dir
+        self.cycle = None
+        self.pages_saved = 0
+        os.makedirs(capture_dir, exist_ok=True)
+
+    def start_cycle(self):
+        """Group the pages saved from now on under a new cycle"""
+        self.cycle = time.time_ns()
+
+    def save(self, url, body):
+        """Compress and store one downloaded page; body is the raw response bytes"""
+        if self.cycle is None:
+            self.start_cycle()
+        query, page = page_request(url)
+        name = f"{self.cycle}-{hashlib.blake2b(url.encode('utf-8'), digest_size=6).hexdigest()}.html.gz"
+        try:
+            with gzip.open(os.path.join(self.capture_dir, name), 'wb') as f:
+                f.write(body)
+            with open(os.path.join(self.capture_dir, MANIFEST_FILE), 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'cycle': self.cycle, 'query': query, 'page': page, 'file': name}) + '\n')
+            self.pages_saved += 1
+        except OSError as e:
+            logger.error(f"Could not capture {url}: {e}")
+
+
+class PageCorpus:
+    """A captured corpus, indexed by cycle, query and page"""
+
+    def __init__(self, capture_dir):
+        self.capture_dir = os.path.abspath(capture_dir)
+        entries = []
+        with open(os.path.join(capture_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entries.append(json.loads(line))
+
+        self.cycles = sorted({entry['cycle'] for entry in entries})
+        order = {cycle: index for index, cycle in enumerate(self.cycles)}
+        # (query, page) -> [(cycle index, file)] in capture order
+        self.pages = {}
+        for entry in entries:
+            key = (entry['query'].lower(), entry['page'])
+            self.pages.setdefault(key, []).append((order[entry['cycle']], entry['file']))
+        for versions in self.pages.values():
+            versions.sort()
+        self.queries = sorted({entry['query'] for entry in entries})
+        self._bodies = {}
+
+    def __len__(self):
+        return sum(len(versions) for versions in self.pages.values())
+
+    def body(self, name):
+        """Decompressed page bytes, read from disk once"""
+        body = self._bodies.get(name)
+        if body is None:
+            with gzip.open(os.path.join(self.capture_dir, name), 'rb') as f:
+                body = self._bodies[name] = f.read()
+        return body
+
+    def page(self, query, page, cycle):
+        """The latest capture of this page made at or before cycle, or None"""
+        found = None
+        for index, name in self.pages.get((query.lower(), page), ()):
+            if index > cycle:
+                break
+            found = name
+        return self.body(found) if found else None
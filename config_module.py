@@ -1,9 +1,83 @@
 import json
 import os
+import hashlib
 import logging
+import tempfile
 
 logger = logging.getLogger(__name__)
 
+# Default configuration
+DEFAULT_CONFIG = {
+    "discord": {
+        "token": "",
+        "channel_id": ""
+    },
+    "scraping": {
+        "search_terms": ["Jordan 1", "Nike Dunk","Adidas"],
+        "check_interval_minutes": 3,
+        "min_interval_minutes": 1,
+        "max_interval_minutes": 15,
+        "max_listings_per_search": 20,
+        "items_per_page": 50,
+        "max_pages": 5,
+        "parser": "lxml",
+        "parse_workers": 0,
+        "parse_executor": "process",
+        "streaming": False,
+        "share_overlapping_terms": True,
+        "capture_dir": "",
+        "max_concurrent_requests": 4,
+        "max_requests_per_second": 1.0
+    },
+    "posting": {
+        "max_embeds_per_message": 10,
+        "min_send_interval_seconds": 0,
+        "max_queue_size": 500
+    },
+    "filters": {
+        "min_price": 50,
+        "max_price": 300,
+        "include_keywords": [
+            "Jordan 1", "AJ1", "Air Jordan 1",
+            "Nike Dunk", "Dunk Low", "Dunk High", "SB Dunk"
+        ],
+        "exclude_keywords": [
+            "kids", "youth", "toddler", "infant", "baby",
+            "replica", "fake", "custom", "damaged", "broken",
+            "used", "worn", "beat", "beater"
+        ]
+    },
+    "deal_scoring": {
+        "price_thresholds": {
+            "excellent": 80,
+            "good": 120,
+            "fair": 160,
+            "poor": 200
+        },
+        "bonus_keywords": [
+            "retro", "og", "original", "deadstock", "ds",
+            "off white", "travis scott", "fragment", "chicago"
+        ],
+        "bonus_keyword_points": 1
+    },
+    "price_index": {
+        "enabled": True,
+        "window_days": 30,
+        "min_samples": 10
+    },
+    "history": {
+        "enabled": True,
+        "dir": "history"
+    },
+    "metrics": {
+        "enabled": False,
+        "host": "127.0.0.1",
+        "port": 9108,
+        "profile_dir": "profiles"
+    }
+}
+
+
 class Config:
     def __init__(self, config_file='config.json'):
         self.config_file = config_file
@@ -11,43 +85,7 @@ class Config:
     
     def load_config(self):
         """Load configuration from JSON file"""
-        # Default configuration
-        default_config = {
-            "discord": {
-                "token": "",
-                "channel_id": ""
-            },
-            "scraping": {
-                "search_terms": ["Jordan 1", "Nike Dunk","Adidas"],
-                "check_interval_minutes": 3,
-                "max_listings_per_search": 20
-            },
-            "filters": {
-                "min_price": 50,
-                "max_price": 300,
-                "include_keywords": [
-                    "Jordan 1", "AJ1", "Air Jordan 1",
-                    "Nike Dunk", "Dunk Low", "Dunk High", "SB Dunk"
-                ],
-                "exclude_keywords": [
-                    "kids", "youth", "toddler", "infant", "baby",
-                    "replica", "fake", "custom", "damaged", "broken",
-                    "used", "worn", "beat", "beater"
-                ]
-            },
-            "deal_scoring": {
-                "price_thresholds": {
-                    "excellent": 80,
-                    "good": 120,
-                    "fair": 160,
-                    "poor": 200
-                },
-                "bonus_keywords": [
-                    "retro", "og", "original", "deadstock", "ds",
-                    "off white", "travis scott", "fragment", "chicago"
-                ]
-            }
-        }
+        default_config = DEFAULT_CONFIG
         
         # Create config file if it doesn't exist
         if not os.path.exists(self.config_file):
@@ -55,65 +93,215 @@ class Config:
             logger.info(f"Created default config file: {self.config_file}")
         
         # Load configuration
+        self.mtime = None
         try:
+            self.mtime = os.stat(self.config_file).st_mtime_ns
             with open(self.config_file, 'r') as f:
                 config_data = json.load(f)
-            
-            # Discord settings
-            self.DISCORD_TOKEN = config_data.get('discord', {}).get('token', '')
-            self.DISCORD_CHANNEL_ID = int(config_data.get('discord', {}).get('channel_id', '0'))
-            
-            # Scraping settings
-            scraping_config = config_data.get('scraping', {})
-            self.SEARCH_TERMS = scraping_config.get('search_terms', default_config['scraping']['search_terms'])
-            self.CHECK_INTERVAL = scraping_config.get('check_interval_minutes', default_config['scraping']['check_interval_minutes'])
-            self.MAX_LISTINGS_PER_SEARCH = scraping_config.get('max_listings_per_search', default_config['scraping']['max_listings_per_search'])
-            
-            # Filter settings
-            filter_config = config_data.get('filters', {})
-            self.MIN_PRICE = filter_config.get('min_price', default_config['filters']['min_price'])
-            self.MAX_PRICE = filter_config.get('max_price', default_config['filters']['max_price'])
-            self.INCLUDE_KEYWORDS = filter_config.get('include_keywords', default_config['filters']['include_keywords'])
-            self.EXCLUDE_KEYWORDS = filter_config.get('exclude_keywords', default_config['filters']['exclude_keywords'])
-            
-            # Deal scoring settings
-            scoring_config = config_data.get('deal_scoring', {})
-            self.PRICE_THRESHOLDS = scoring_config.get('price_thresholds', default_config['deal_scoring']['price_thresholds'])
-            self.BONUS_KEYWORDS = scoring_config.get('bonus_keywords', default_config['deal_scoring']['bonus_keywords'])
-            
+            self.apply_config_data(config_data)
             logger.info("Configuration loaded successfully")
             
         except Exception as e:
             logger.error(f"Error loading config: {e}")
             self.load_defaults(default_config)
     
+    def apply_config_data(self, config_data):
+        """Set every setting from parsed config.json data"""
+        default_config = DEFAULT_CONFIG
+        self._data = config_data
+        self.section_hashes = {
+            section: hashlib.sha1(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()
+            for section, value in config_data.items()
+        }
+        
+        # Discord settings
+        self.DISCORD_TOKEN = config_data.get('discord', {}).get('token', '')
+        self.DISCORD_CHANNEL_ID = int(config_data.get('discord', {}).get('channel_id', '0'))
+        
+        # Scraping settings
+        scraping_config = config_data.get('scraping', {})
+        self.SEARCH_TERMS = scraping_config.get('search_terms', default_config['scraping']['search_terms'])
+        self.CHECK_INTERVAL = scraping_config.get('check_interval_minutes', default_config['scraping']['check_interval_minutes'])
+        self.MIN_INTERVAL = scraping_config.get('min_interval_minutes', default_config['scraping']['min_interval_minutes'])
+        self.MAX_INTERVAL = scraping_config.get('max_interval_minutes', default_config['scraping']['max_interval_minutes'])
+        self.MAX_LISTINGS_PER_SEARCH = scraping_config.get('max_listings_per_search', default_config['scraping']['max_listings_per_search'])
+        self.ITEMS_PER_PAGE = scraping_config.get('items_per_page', default_config['scraping']['items_per_page'])
+        self.MAX_PAGES = scraping_config.get('max_pages', default_config['scraping']['max_pages'])
+        self.PARSER = scraping_config.get('parser', default_config['scraping']['parser'])
+        self.PARSE_WORKERS = scraping_config.get('parse_workers', default_config['scraping']['parse_workers'])
+        self.PARSE_EXECUTOR = scraping_config.get('parse_executor', default_config['scraping']['parse_executor'])
+        self.STREAMING = scraping_config.get('streaming', default_config['scraping']['streaming'])
+        self.SHARE_OVERLAPPING_TERMS = scraping_config.get('share_overlapping_terms', default_config['scraping']['share_overlapping_terms'])
+        self.CAPTURE_DIR = scraping_config.get('capture_dir', default_config['scraping']['capture_dir'])
+        self.MAX_CONCURRENT_REQUESTS = scraping_config.get('max_concurrent_requests', default_config['scraping']['max_concurrent_requests'])
+        self.MAX_REQUESTS_PER_SECOND = scraping_config.get('max_requests_per_second', default_config['scraping']['max_requests_per_second'])
+        
+        # Posting settings
+        posting_config = config_data.get('posting', {})
+        self.MAX_EMBEDS_PER_MESSAGE = posting_config.get('max_embeds_per_message', default_config['posting']['max_embeds_per_message'])
+        self.MIN_SEND_INTERVAL = posting_config.get('min_send_interval_seconds', default_config['posting']['min_send_interval_seconds'])
+        self.MAX_POST_QUEUE_SIZE = posting_config.get('max_queue_size', default_config['posting']['max_queue_size'])
+        
+        # Filter settings
+        filter_config = config_data.get('filters', {})
+        self.MIN_PRICE = filter_config.get('min_price', default_config['filters']['min_price'])
+        self.MAX_PRICE = filter_config.get('max_price', default_config['filters']['max_price'])
+        self.INCLUDE_KEYWORDS = filter_config.get('include_keywords', default_config['filters']['include_keywords'])
+        self.EXCLUDE_KEYWORDS = filter_config.get('exclude_keywords', default_config['filters']['exclude_keywords'])
+        
+        # Deal scoring settings
+        scoring_config = config_data.get('deal_scoring', {})
+        self.PRICE_THRESHOLDS = scoring_config.get('price_thresholds', default_config['deal_scoring']['price_thresholds'])
+        self.BONUS_KEYWORDS = scoring_config.get('bonus_keywords', default_config['deal_scoring']['bonus_keywords'])
+        self.BONUS_KEYWORD_POINTS = scoring_config.get('bonus_keyword_points', default_config['deal_scoring']['bonus_keyword_points'])
+        self.BONUS_GROUPS = scoring_config.get('bonus_groups')  # None means the built-in model groups
+        
+        # Channel subscriptions; without any, the discord channel gets the global filters
+        self.SUBSCRIPTIONS = self.build_subscriptions(config_data.get('subscriptions'))
+        
+        # Market price index settings
+        index_config = config_data.get('price_index', {})
+        self.PRICE_INDEX_ENABLED = index_config.get('enabled', default_config['price_index']['enabled'])
+        self.PRICE_INDEX_WINDOW_DAYS = index_config.get('window_days', default_config['price_index']['window_days'])
+        self.PRICE_INDEX_MIN_SAMPLES = index_config.get('min_samples', default_config['price_index']['min_samples'])
+
+        # Listing history warehouse settings
+        history_config = config_data.get('history', {})
+        self.HISTORY_ENABLED = history_config.get('enabled', default_config['history']['enabled'])
+        self.HISTORY_DIR = history_config.get('dir', default_config['history']['dir'])
+
+        metrics_config = config_data.get('metrics', {})
+        self.METRICS_ENABLED = metrics_config.get('enabled', default_config['metrics']['enabled'])
+        self.METRICS_HOST = metrics_config.get('host', default_config['metrics']['host'])
+        self.METRICS_PORT = metrics_config.get('port', default_config['metrics']['port'])
+        self.PROFILE_DIR = metrics_config.get('profile_dir', default_config['metrics']['profile_dir'])
+    
     def create_default_config(self, default_config):
         """Create default configuration file"""
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(default_config, f, indent=4)
+            self.write_config_file(default_config)
         except Exception as e:
             logger.error(f"Error creating config file: {e}")
     
+    def write_config_file(self, config_data):
+        """Write config.json atomically so a reader never sees a half-written file"""
+        directory = os.path.dirname(os.path.abspath(self.config_file))
+        fd, temp_path = tempfile.mkstemp(prefix='.config-', suffix='.json', dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(config_data, f, indent=4)
+            os.replace(temp_path, self.config_file)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return os.stat(self.config_file).st_mtime_ns
+    
     def load_defaults(self, default_config):
         """Load default configuration values"""
+        self._data = None
+        self.section_hashes = {}
         self.DISCORD_TOKEN = ''
         self.DISCORD_CHANNEL_ID = 0
         self.SEARCH_TERMS = default_config['scraping']['search_terms']
         self.CHECK_INTERVAL = default_config['scraping']['check_interval_minutes']
+        self.MIN_INTERVAL = default_config['scraping']['min_interval_minutes']
+        self.MAX_INTERVAL = default_config['scraping']['max_interval_minutes']
         self.MAX_LISTINGS_PER_SEARCH = default_config['scraping']['max_listings_per_search']
+        self.ITEMS_PER_PAGE = default_config['scraping']['items_per_page']
+        self.MAX_PAGES = default_config['scraping']['max_pages']
+        self.PARSER = default_config['scraping']['parser']
+        self.PARSE_WORKERS = default_config['scraping']['parse_workers']
+        self.PARSE_EXECUTOR = default_config['scraping']['parse_executor']
+        self.STREAMING = default_config['scraping']['streaming']
+        self.SHARE_OVERLAPPING_TERMS = default_config['scraping']['share_overlapping_terms']
+        self.CAPTURE_DIR = default_config['scraping']['capture_dir']
+        self.MAX_CONCURRENT_REQUESTS = default_config['scraping']['max_concurrent_requests']
+        self.MAX_REQUESTS_PER_SECOND = default_config['scraping']['max_requests_per_second']
+        self.MAX_EMBEDS_PER_MESSAGE = default_config['posting']['max_embeds_per_message']
+        self.MIN_SEND_INTERVAL = default_config['posting']['min_send_interval_seconds']
+        self.MAX_POST_QUEUE_SIZE = default_config['posting']['max_queue_size']
         self.MIN_PRICE = default_config['filters']['min_price']
         self.MAX_PRICE = default_config['filters']['max_price']
         self.INCLUDE_KEYWORDS = default_config['filters']['include_keywords']
         self.EXCLUDE_KEYWORDS = default_config['filters']['exclude_keywords']
         self.PRICE_THRESHOLDS = default_config['deal_scoring']['price_thresholds']
         self.BONUS_KEYWORDS = default_config['deal_scoring']['bonus_keywords']
+        self.BONUS_KEYWORD_POINTS = default_config['deal_scoring']['bonus_keyword_points']
+        self.BONUS_GROUPS = None
+        self.SUBSCRIPTIONS = self.build_subscriptions(None)
+        self.PRICE_INDEX_ENABLED = default_config['price_index']['enabled']
+        self.PRICE_INDEX_WINDOW_DAYS = default_config['price_index']['window_days']
+        self.PRICE_INDEX_MIN_SAMPLES = default_config['price_index']['min_samples']
+        self.HISTORY_ENABLED = default_config['history']['enabled']
+        self.HISTORY_DIR = default_config['history']['dir']
+        self.METRICS_ENABLED = default_config['metrics']['enabled']
+        self.METRICS_HOST = default_config['metrics']['host']
+        self.METRICS_PORT = default_config['metrics']['port']
+        self.PROFILE_DIR = default_config['metrics']['profile_dir']
     
-    def update_config(self, key, value):
-        """Update a configuration value"""
+    def build_subscriptions(self, subscriptions):
+        """Fill in each subscription's missing filters from the global filter settings"""
+        if not subscriptions:
+            subscriptions = [{'name': 'default', 'channel_id': self.DISCORD_CHANNEL_ID}]
+        return [
+            {
+                'name': subscription.get('name', str(subscription.get('channel_id', ''))),
+                'channel_id': int(subscription.get('channel_id', 0) or 0),
+                'min_price': subscription.get('min_price', self.MIN_PRICE),
+                'max_price': subscription.get('max_price', self.MAX_PRICE),
+                'include_keywords': subscription.get('include_keywords', self.INCLUDE_KEYWORDS),
+                'exclude_keywords': subscription.get('exclude_keywords', self.EXCLUDE_KEYWORDS),
+                'min_score': subscription.get('min_score', 0),
+            }
+            for subscription in subscriptions
+        ]
+    
+    def check_for_changes(self):
+        """Reload config.json if it changed on disk and return the names of the changed sections.
+        
+        The new file is parsed and validated into a separate snapshot first and
+        only then swapped in, so a broken edit leaves the running settings alone.
+        """
+        try:
+            mtime = os.stat(self.config_file).st_mtime_ns
+        except OSError:
+            return set()
+        if mtime == self.mtime:
+            return set()
+        self.mtime = mtime
+        
         try:
             with open(self.config_file, 'r') as f:
                 config_data = json.load(f)
+            snapshot = Config.__new__(Config)
+            snapshot.config_file = self.config_file
+            snapshot.mtime = mtime
+            snapshot.apply_config_data(config_data)
+        except Exception as e:
+            logger.error(f"Ignoring config change, could not load it: {e}")
+            return set()
+        
+        issues = snapshot.validate_config()
+        if issues:
+            logger.error(f"Ignoring config change: {'; '.join(issues)}")
+            return set()
+        
+        sections = set(self.section_hashes) | set(snapshot.section_hashes)
+        changed = {section for section in sections
+                   if self.section_hashes.get(section) != snapshot.section_hashes.get(section)}
+        self.__dict__.update(snapshot.__dict__)
+        if changed:
+            logger.info(f"Reloaded config, changed sections: {', '.join(sorted(changed))}")
+        return changed
+    
+    def update_config(self, key, value):
+        """Update a configuration value"""
+        try:
+            # Pick up edits made on disk since the last load before writing over them
+            self.check_for_changes()
+            if self._data is None:
+                raise ValueError(f"{self.config_file} could not be loaded")
+            config_data = json.loads(json.dumps(self._data))
             
             # Update the value using dot notation
             keys = key.split('.')
@@ -124,9 +312,9 @@ class Config:
                 current = current[k]
             current[keys[-1]] = value
             
-            # Save updated config
-            with open(self.config_file, 'w') as f:
-                json.dump(config_data, f, indent=4)
+            # Save updated config and apply it without reading the file back
+            self.mtime = self.write_config_file(config_data)
+            self.apply_config_data(config_data)
             
             logger.info(f"Updated config: {key} = {value}")
             
@@ -140,8 +328,11 @@ class Config:
         if not self.DISCORD_TOKEN:
             issues.append("Discord token is not set")
         
-        if not self.DISCORD_CHANNEL_ID:
-            issues.append("Discord channel ID is not set")
+        for subscription in self.SUBSCRIPTIONS:
+            if not subscription['channel_id']:
+                issues.append(f"Discord channel ID is not set for subscription '{subscription['name']}'")
+            if subscription['min_price'] >= subscription['max_price']:
+                issues.append(f"Min price must be less than max price for subscription '{subscription['name']}'")
         
         if self.MIN_PRICE >= self.MAX_PRICE:
             issues.append("Min price must be less than max price")
@@ -155,6 +346,33 @@ class Config:
         if self.CHECK_INTERVAL < 1:
             issues.append("Check interval must be at least 1 minute")
         
+        if not self.MIN_INTERVAL <= self.CHECK_INTERVAL <= self.MAX_INTERVAL:
+            issues.append("Check interval must be between the min and max intervals")
+        
+        if self.MAX_PAGES < 1:
+            issues.append("Max pages must be at least 1")
+        
+        if self.PARSE_EXECUTOR not in ('process', 'thread'):
+            issues.append("Parse executor must be 'process' or 'thread'")
+        
+        if self.MAX_CONCURRENT_REQUESTS < 1:
+            issues.append("Max concurrent requests must be at least 1")
+        
+        if self.MAX_REQUESTS_PER_SECOND <= 0:
+            issues.append("Max requests per second must be positive")
+        
+        if len(self.PRICE_THRESHOLDS) < 2:
+            issues.append("At least two deal scoring price thresholds are needed")
+        
+        if self.PRICE_INDEX_WINDOW_DAYS < 1:
+            issues.append("Price index window must be at least 1 day")
+        
+        if not 0 < self.METRICS_PORT < 65536:
+            issues.append("Metrics port must be between 1 and 65535")
+        
+        if not 1 <= self.MAX_EMBEDS_PER_MESSAGE <= 10:
+            issues.append("Max embeds per message must be between 1 and 10")
+        
         return issues
     
     def print_config(self):
@@ -162,8 +380,9 @@ class Config:
         print("\n=== Current Configuration ===")
         print(f"Discord Token: {'*' * 10 if self.DISCORD_TOKEN else 'NOT SET'}")
         print(f"Discord Channel ID: {self.DISCORD_CHANNEL_ID}")
+        print(f"Subscriptions: {', '.join(subscription['name'] for subscription in self.SUBSCRIPTIONS)}")
         print(f"Search Terms: {self.SEARCH_TERMS}")
-        print(f"Check Interval: {self.CHECK_INTERVAL} minutes")
+        print(f"Check Interval: {self.CHECK_INTERVAL} minutes ({self.MIN_INTERVAL}-{self.MAX_INTERVAL} adaptive)")
         print(f"Price Range: ${self.MIN_PRICE} - ${self.MAX_PRICE}")
         print(f"Include Keywords: {self.INCLUDE_KEYWORDS}")
         print(f"Exclude Keywords: {self.EXCLUDE_KEYWORDS}")
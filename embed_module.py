@@ -0,0 +1,52 @@
+import discord
+from datetime import datetime
+from scoring_module import MIN_SCORE, MAX_SCORE
+
+
+def score_color(deal_score):
+    """Green for great deals, orange for good ones, red otherwise"""
+    return 0x00ff00 if deal_score >= 8 else 0xffa500 if deal_score >= 6 else 0xff0000
+
+
+class EmbedRenderer:
+    """Builds deal embeds from parts worked out ahead of time.
+
+    Colours and score labels are computed once per score, and the footer
+    once per cycle, so rendering an embed only formats the listing's own
+    fields. Deals are rendered when they are posted, not when they are
+    found.
+    """
+
+    def __init__(self):
+        self.colors = {score: discord.Colour(score_color(score)) for score in range(MIN_SCORE, MAX_SCORE + 1)}
+        self.score_labels = {score: f"{score}/{MAX_SCORE}" for score in range(MIN_SCORE, MAX_SCORE + 1)}
+        self.footer = None
+        self.start_cycle()
+
+    def start_cycle(self, now=None):
+        """Stamp embeds rendered from now on with this cycle's time"""
+        now = now or datetime.now()
+        self.footer = f"Found on eBay • {now.strftime('%Y-%m-%d %H:%M:%S')}"
+
+    def render(self, listing, deal_score, reference=None, footer=None):
+        """Return the embed for one deal"""
+        color = self.colors.get(deal_score)
+        embed = discord.Embed(
+            title=f"🔥 {listing.title}",
+            url=listing.url,
+            color=color if color is not None else score_color(deal_score)
+        )
+
+        embed.add_field(name="💰 Price", value=f"${listing.price:.2f}", inline=True)
+        embed.add_field(name="📦 Condition", value=listing.condition, inline=True)
+        embed.add_field(name="⭐ Deal Score", value=self.score_labels.get(deal_score) or f"{deal_score}/{MAX_SCORE}", inline=True)
+
+        if reference:
+            discount = 1 - listing.price / reference
+            embed.add_field(name="📊 Market", value=f"${reference:.0f} median ({discount:.0%} off)", inline=True)
+
+        if listing.image_url:
+            embed.set_thumbnail(url=listing.image_url)
+
+        embed.set_footer(text=footer or self.footer)
+        return embed
@@ -0,0 +1,261 @@
+import os
+import sys
+import json
+import asyncio
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from statistics import median
+from price_index_module import ModelNormalizer
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; days stay as JSON lines without it
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+STAGING_FILE = 'observations.jsonl'
+# Staged rows a compaction has taken over
+COMPACTING_FILE = 'observations.jsonl.compacting'
+COMPACTED_FILE = 'observations.parquet'
+
+# One row per listing seen in a scrape cycle, in column order
+COLUMNS = (
+    'observed_at', 'item_id', 'search_term', 'title', 'price',
+    'condition', 'upper_material', 'model', 'score',
+)
+
+
+def parquet_schema():
+    """Column types of the compacted day files"""
+    return pa.schema([
+        ('observed_at', pa.timestamp('ms', tz='UTC')),
+        ('item_id', pa.int64()),
+        ('search_term', pa.string()),
+        ('title', pa.string()),
+        ('price', pa.float64()),
+        ('condition', pa.string()),
+        ('upper_material', pa.string()),
+        ('model', pa.string()),
+        ('score', pa.int8()),
+    ])
+
+
+class ListingHistory:
+    """Append-only record of every listing observation, partitioned by day.
+
+    Each cycle's observations are appended as JSON lines to
+    history/day=YYYY-MM-DD/observations.jsonl. Once a day is over, compact()
+    rewrites it as one Parquet file sorted by model, so a price query reads
+    two columns of the days it covers and skips other models' row groups.
+    Writes run on a dedicated single-thread executor, like the ListingStore,
+    and compaction on a second one so rewriting a large day never delays a
+    cycle's append. Appends normally only touch today, which compaction
+    skips; one queued just before midnight starts a fresh staging file that
+    the next compaction picks up. The history never feeds back into
+    deduplication.
+    """
+
+    ROW_GROUP_SIZE = 50000
+
+    def __init__(self, history_dir='history', normalizer=None):
+        self.history_dir = history_dir
+        self.normalizer = normalizer or ModelNormalizer()
+        self.rows_written = 0
+        self._warned_no_pyarrow = False
+        self._staging_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='listing-history')
+        self._compact_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='listing-history-compact')
+
+    @staticmethod
+    def today():
+        return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+    def day_dir(self, day):
+        return os.path.join(self.history_dir, f'day={day}')
+
+    def days(self, start_day=None, end_day=None):
+        """Partitions on disk between start_day and end_day inclusive, oldest first"""
+        try:
+            names = os.listdir(self.history_dir)
+        except FileNotFoundError:
+            return []
+        days = sorted(name[4:] for name in names if name.startswith('day='))
+        return [day for day in days if (not start_day or day >= start_day) and (not end_day or day <= end_day)]
+
+    async def _run(self, func, *args, executor=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor or self._executor, func, *args)
+
+    def _append(self, day, rows):
+        os.makedirs(self.day_dir(day), exist_ok=True)
+        lines = []
+        for row in rows:
+            if row[7] is None:
+                # Observations the bot never scored still get a model for trend queries
+                row = row[:7] + (self.normalizer.model_key(row[3]),) + row[8:]
+            lines.append(json.dumps(dict(zip(COLUMNS, row))))
+        with self._staging_lock:
+            with open(os.path.join(self.day_dir(day), STAGING_FILE), 'a', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+        return len(lines)
+
+    async def record_many(self, listings, scores=None):
+        """Append one observation per listing; scores maps listing keys to their deal score"""
+        scores = scores or {}
+        now = datetime.now(timezone.utc)
+        observed_at = now.isoformat(timespec='milliseconds')
+        rows = [
+            (observed_at, listing.key, listing.search_term, listing.title, listing.price,
+             listing.condition, listing.upper_material, listing.model, scores.get(listing.key))
+            for listing in listings
+        ]
+        if not rows:
+            return 0
+        written = await self._run(self._append, now.strftime('%Y-%m-%d'), rows)
+        self.rows_written += written
+        return written
+
+    @staticmethod
+    def _read_staging(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _compact_day(self, day):
+        directory = self.day_dir(day)
+        staging_path = os.path.join(directory, STAGING_FILE)
+        compacting_path = os.path.join(directory, COMPACTING_FILE)
+        compacted_path = os.path.join(directory, COMPACTED_FILE)
+        # Take the staged rows over so an append arriving meanwhile goes to a new file
+        with self._staging_lock:
+            if os.path.exists(staging_path):
+                if os.path.exists(compacting_path):
+                    # Left behind by an interrupted compaction
+                    with open(staging_path, 'r', encoding='utf-8') as source, \
+                            open(compacting_path, 'a', encoding='utf-8') as f:
+                        f.write(source.read())
+                    os.remove(staging_path)
+                else:
+                    os.replace(staging_path, compacting_path)
+        rows = self._read_staging(compacting_path)
+        for row in rows:
+            row['observed_at'] = datetime.fromisoformat(row['observed_at'])
+        rows.sort(key=lambda row: (row['model'] or '', row['observed_at']))
+
+        schema = parquet_schema()
+        table = pa.Table.from_pydict({column: [row[column] for row in rows] for column in COLUMNS}, schema=schema)
+        if os.path.exists(compacted_path):
+            # Observations that arrived after the day was compacted
+            table = pa.concat_tables([pq.read_table(compacted_path, schema=schema), table])
+            table = table.sort_by([('model', 'ascending'), ('observed_at', 'ascending')])
+
+        temp_path = compacted_path + '.tmp'
+        pq.write_table(table, temp_path, compression='zstd', row_group_size=self.ROW_GROUP_SIZE)
+        os.replace(temp_path, compacted_path)
+        os.remove(compacting_path)
+        return table.num_rows
+
+    def _compact(self, today):
+        if pq is None:
+            if not self._warned_no_pyarrow:
+                logger.warning("pyarrow is not installed, listing history stays as JSON lines")
+                self._warned_no_pyarrow = True
+            return 0
+        compacted = 0
+        for day in self.days(end_day=today):
+            # Today's file is still being appended to
+            if day >= today or not any(os.path.exists(os.path.join(self.day_dir(day), name))
+                                       for name in (STAGING_FILE, COMPACTING_FILE)):
+                continue
+            try:
+                rows = self._compact_day(day)
+                logger.info(f"Compacted {rows} listing observations for {day}")
+                compacted += 1
+            except Exception as e:
+                logger.error(f"Error compacting listing history for {day}: {e}")
+        return compacted
+
+    async def compact(self, today=None):
+        """Rewrite finished days as Parquet and return how many were compacted"""
+        return await self._run(self._compact, today or self.today(), executor=self._compact_executor)
+
+    def _day_prices(self, day, models):
+        """{model: [price, ...]} for one day, reading only the model and price columns"""
+        directory = self.day_dir(day)
+        prices = {}
+        compacted_path = os.path.join(directory, COMPACTED_FILE)
+        if pq is not None and os.path.exists(compacted_path):
+            filters = [('model', 'in', sorted(models))] if models else [('model', '!=', '')]
+            table = pq.read_table(compacted_path, columns=['model', 'price'], filters=filters)
+            for model, price in zip(table.column('model').to_pylist(), table.column('price').to_pylist()):
+                if model is not None and price:
+                    prices.setdefault(model, []).append(price)
+        for name in (COMPACTING_FILE, STAGING_FILE):
+            staging_path = os.path.join(directory, name)
+            if not os.path.exists(staging_path):
+                continue
+            for row in self._read_staging(staging_path):
+                model = row['model']
+                if model is not None and row['price'] and (not models or model in models):
+                    prices.setdefault(model, []).append(row['price'])
+        return prices
+
+    def price_trends(self, models=None, start_day=None, end_day=None):
+        """Daily price summaries as {model: [(day, count, min, median, max), ...]}.
+
+        Only the partitions between start_day and end_day are opened.
+        """
+        models = set(models) if models else None
+        trends = {}
+        for day in self.days(start_day, end_day):
+            for model, prices in self._day_prices(day, models).items():
+                trends.setdefault(model, []).append((day, len(prices), min(prices), median(prices), max(prices)))
+        return trends
+
+    def stats(self):
+        """Return partition counts and bytes on disk for logging"""
+        compacted = staged = size = 0
+        for day in self.days():
+            for name in (COMPACTED_FILE, STAGING_FILE):
+                path = os.path.join(self.day_dir(day), name)
+                if os.path.exists(path):
+                    size += os.path.getsize(path)
+                    if name == COMPACTED_FILE:
+                        compacted += 1
+                    else:
+                        staged += 1
+        return {'compacted_days': compacted, 'staged_days': staged, 'bytes': size}
+
+    async def close(self):
+        """Finish pending writes and compaction and shut down the executors"""
+        self._executor.shutdown(wait=True)
+        self._compact_executor.shutdown(wait=True)
+
+
+# Print daily price trends from the listing history
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Summarize daily prices per model from the listing history")
+    arg_parser.add_argument('history_dir', nargs='?', default='history')
+    arg_parser.add_argument('models', nargs='*', help="model keys, e.g. 'jordan 1 high' (defaults to all)")
+    arg_parser.add_argument('--days', type=int, default=30, help="how many days back to cover")
+    arg_parser.add_argument('--compact', action='store_true', help="compact finished days to Parquet first")
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    history = ListingHistory(args.history_dir)
+    if args.compact:
+        history._compact(history.today())
+
+    start_day = (datetime.now(timezone.utc) - timedelta(days=args.days - 1)).strftime('%Y-%m-%d')
+    trends = history.price_trends(args.models, start_day)
+    if not trends:
+        print(f"No observations in {args.history_dir} since {start_day}")
+        sys.exit(0)
+    for model in sorted(trends):
+        print(f"\n{model}")
+        for day, count, low, mid, high in trends[model]:
+            print(f"  {day}  {count:>5} listings  ${low:>7.2f}  median ${mid:>7.2f}  ${high:>7.2f}")
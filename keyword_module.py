@@ -0,0 +1,109 @@
+import re
+
+
+def normalize_text(text):
+    """Lowercase and collapse whitespace so titles and keywords compare equal"""
+    return ' '.join(text.lower().split())
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == '_'
+
+
+def _trie_pattern(words):
+    """Build a regex alternation shaped like a trie of words.
+
+    Matching then costs one step per character instead of one attempt per
+    keyword, which keeps a pass over a title fast with thousands of keywords.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            body = '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Tags a text with every keyword it contains as a whole word, in one regex pass.
+
+    Each keyword maps to one or more tags. Keywords only match on word
+    boundaries, so "ds" no longer fires inside "kids". Overlapping keywords
+    ("nike dunk" and "dunk low") are all reported.
+    """
+
+    def __init__(self, keyword_tags):
+        self.keyword_tags = {}
+        for keyword, tags in keyword_tags.items():
+            keyword = normalize_text(keyword)
+            if keyword:
+                self.keyword_tags.setdefault(keyword, set()).update(tags)
+
+        # At one start position the regex reports only the longest keyword,
+        # so fold in the tags of every keyword it extends at a word boundary
+        self.match_tags = {}
+        for keyword, tags in self.keyword_tags.items():
+            combined = set(tags)
+            for end in range(1, len(keyword)):
+                prefix = keyword[:end]
+                if prefix in self.keyword_tags and not (_is_word_char(keyword[end - 1]) and _is_word_char(keyword[end])):
+                    combined |= self.keyword_tags[prefix]
+            self.match_tags[keyword] = frozenset(combined)
+
+        if self.keyword_tags:
+            # Zero-width lookahead so matches may overlap and start at any word
+            self.regex = re.compile(r'(?<!\w)(?=(' + _trie_pattern(self.keyword_tags) + r')(?!\w))')
+        else:
+            self.regex = None
+
+    def tags(self, text):
+        """Return the union of tags of every keyword found in text"""
+        found = set()
+        if self.regex is None:
+            return found
+        for match in self.regex.finditer(normalize_text(text)):
+            found |= self.match_tags[match.group(1)]
+        return found
+
+
+class KeywordEngine:
+    """One matcher for the deal score groups and the subscriptions' keyword filters.
+
+    Tags are ('group', index) for each of score_groups, plus any extra_tags
+    ({keyword: {tag, ...}}) other components need, so a listing title is
+    scanned once for all of them.
+    """
+
+    def __init__(self, score_groups=(), extra_tags=None):
+        self.score_groups = [(list(keywords), points) for keywords, points in score_groups]
+
+        keyword_tags = {}
+        for index, (keywords, _) in enumerate(self.score_groups):
+            for keyword in keywords:
+                keyword_tags.setdefault(keyword, set()).add(('group', index))
+        for keyword, tags in (extra_tags or {}).items():
+            keyword_tags.setdefault(keyword, set()).update(tags)
+        self.matcher = KeywordMatcher(keyword_tags)
+
+    def scan(self, title):
+        """Return every tag matched by title"""
+        return self.matcher.tags(title)
+
+    def group_mask(self, tags):
+        """Bitmask of the score groups present in tags"""
+        mask = 0
+        for tag in tags:
+            if type(tag) is tuple and tag[0] == 'group':
+                mask |= 1 << tag[1]
+        return mask
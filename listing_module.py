@@ -0,0 +1,82 @@
+import re
+import hashlib
+
+ITEM_ID_RE = re.compile(r'/itm/(?:[^/?#]*/)?(\d+)')
+
+
+def strip_tracking(url):
+    """Drop the query string and fragment eBay uses for tracking"""
+    return url.split('?', 1)[0].split('#', 1)[0]
+
+
+def parse_item_id(url):
+    """Return the numeric eBay item ID in a listing URL, or None"""
+    match = ITEM_ID_RE.search(url)
+    return int(match.group(1)) if match else None
+
+
+def listing_key(url):
+    """Integer dedup key for a listing URL.
+
+    This is the eBay item ID, so every URL shape of one item maps to the
+    same key. URLs without one fall back to a negative hash of the URL,
+    which cannot collide with a real item ID.
+    """
+    item_id = parse_item_id(url)
+    if item_id is not None:
+        return item_id
+    digest = hashlib.blake2b(strip_tracking(url).encode('utf-8'), digest_size=8).digest()
+    return -(int.from_bytes(digest, 'little') >> 1) - 1
+
+
+class Listing:
+    """One search result as it moves from the parser to the database.
+
+    Uses __slots__ so tens of thousands of listings held by the caches and
+    the price index stay small. The lowercased title, canonical URL and
+    eBay item ID are derived once here instead of by every consumer; key
+    is the integer used for deduplication everywhere.
+    search_term and model are filled in later by the scraper and the bot.
+    """
+
+    __slots__ = (
+        'title', 'price', 'condition', 'upper_material', 'url', 'image_url',
+        'title_lower', 'canonical_url', 'listing_id', 'key', 'search_term', 'model',
+    )
+
+    # Field order of the compact tuples passed between parse workers and the loop
+    FIELDS = ('title', 'price', 'condition', 'upper_material', 'url', 'image_url')
+
+    def __init__(self, title, price, condition, upper_material, url, image_url, search_term=None):
+        self.title = title
+        self.price = price
+        self.condition = condition
+        self.upper_material = upper_material
+        self.url = strip_tracking(url)
+        self.image_url = image_url
+        self.title_lower = title.lower()
+        self.listing_id = parse_item_id(self.url)
+        self.canonical_url = f"https://www.ebay.com/itm/{self.listing_id}" if self.listing_id else self.url
+        self.key = self.listing_id if self.listing_id is not None else listing_key(self.url)
+        self.search_term = search_term
+        self.model = None
+
+    @classmethod
+    def from_tuple(cls, values):
+        """Rebuild a listing from as_tuple() output"""
+        return cls(*values)
+
+    def as_tuple(self):
+        """Parsed fields only, in FIELDS order"""
+        return (self.title, self.price, self.condition, self.upper_material, self.url, self.image_url)
+
+    def __eq__(self, other):
+        if not isinstance(other, Listing):
+            return NotImplemented
+        return self.as_tuple() == other.as_tuple()
+
+    def __hash__(self):
+        return hash(self.as_tuple())
+
+    def __repr__(self):
+        return f"Listing({self.title!r}, ${self.price:.2f}, {self.url!r})"
@@ -0,0 +1,144 @@
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+CONSOLE_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# LogRecord attributes that are not user-supplied extra fields
+STANDARD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with any extra= fields as keys"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in STANDARD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SampledFilter(logging.Filter):
+    """Caps repetitive messages at burst records per interval.
+
+    Only records logged with extra={'sample': key} are limited, each key on
+    its own budget; the first record of the next interval reports how many
+    were dropped. Sits on the queue handler so dropped records cost one
+    dict lookup and never reach the writer thread.
+    """
+
+    def __init__(self, burst=20, interval=60.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.windows = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        key = getattr(record, 'sample', None)
+        if key is None:
+            return True
+        now = time.monotonic()
+        with self.lock:
+            window = self.windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self.windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.getMessage()} ({suppressed} similar messages suppressed)"
+                    record.args = None
+                    record.suppressed = suppressed
+                return True
+            window[1] += 1
+            if window[1] <= self.burst:
+                return True
+            window[2] += 1
+            return False
+
+
+def setup_logging(log_file='bot.log', level=logging.INFO, max_bytes=10 * 1024 * 1024, backup_count=5,
+                  json_format=True, console=True, sample_burst=20, sample_interval=60.0):
+    """Route all logging through a queue to a background writer thread.
+
+    Callers only enqueue the record; formatting, the size-rotated log file
+    and the console are handled by a QueueListener. Like basicConfig this
+    does nothing if the root logger already has handlers, and returns the
+    listener it started (or None).
+    """
+    global _listener
+    root = logging.getLogger()
+    if root.handlers:
+        return None
+
+    file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    file_handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(CONSOLE_FORMAT))
+    handlers = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(SampledFilter(sample_burst, sample_interval))
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(stop_logging)
+    return _listener
+
+
+class _Redispatch(logging.Handler):
+    """Hands records from worker processes to this process's loggers"""
+
+    def handle(self, record):
+        logging.getLogger(record.name).handle(record)
+        return True
+
+
+def start_worker_log_listener(mp_context):
+    """Create a queue worker processes log into and a thread replaying it here.
+
+    Records then go through this process's handlers, sampling included.
+    Returns (queue, listener); pass the queue to setup_worker_logging.
+    """
+    log_queue = mp_context.Queue()
+    listener = QueueListener(log_queue, _Redispatch())
+    listener.start()
+    return log_queue, listener
+
+
+def setup_worker_logging(log_queue, level=logging.INFO):
+    """Executor initializer: send a worker process's logging to the parent's queue"""
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+
+
+def stop_logging():
+    """Stop the writer thread after it has written every queued record"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,238 @@
+import io
+import os
+import time
+import pstats
+import cProfile
+import logging
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Seconds, from a fast SQLite lookup up to a slow multi-page term
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 524288, 1048576, 2097152, 4194304)
+
+
+class Histogram:
+    """Cumulative-bucket histogram; observe() is one bisect and three adds"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @contextmanager
+    def time(self):
+        """Observe the wall time of a with block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class MetricFamily:
+    """One named metric and its children, one per label value combination"""
+
+    def __init__(self, name, help_text, kind, factory, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self.factory = factory
+        self.label_names = tuple(labels)
+        self.children = {}
+        if not self.label_names:
+            self.children[()] = factory()
+
+    def labels(self, *values):
+        child = self.children.get(values)
+        if child is None:
+            child = self.children[values] = self.factory()
+        return child
+
+    # Unlabelled families act as their only child
+    def observe(self, value):
+        self.children[()].observe(value)
+
+    def time(self):
+        return self.children[()].time()
+
+    def inc(self, amount=1):
+        self.children[()].inc(amount)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class MetricsRegistry:
+    """In-process metrics rendered in the Prometheus text format.
+
+    Nothing is exported until /metrics is scraped, so instrumented code
+    only pays for updating a few numbers. Gauges are callbacks read at
+    scrape time, which suits queue depths owned by other objects.
+    """
+
+    def __init__(self):
+        self.families = {}
+        self.gauges = {}
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        family = self.families.get(name)
+        if family is None:
+            family = self.families[name] = MetricFamily(name, help_text, 'histogram', lambda: Histogram(buckets), labels)
+        return family
+
+    def counter(self, name, help_text, labels=()):
+        family = self.families.get(name)
+        if family is None:
+            family = self.families[name] = MetricFamily(name, help_text, 'counter', Counter, labels)
+        return family
+
+    def gauge(self, name, help_text, callback):
+        """Register a gauge whose value is read from callback() at scrape time"""
+        self.gauges[name] = (help_text, callback)
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format"""
+        lines = []
+        for family in self.families.values():
+            lines.append(f"# HELP {family.name} {family.help_text}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for values, child in list(family.children.items()):
+                if family.kind == 'counter':
+                    lines.append(f"{family.name}{_format_labels(family.label_names, values)} {child.value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(child.buckets + (float('inf'),), child.counts):
+                    cumulative += count
+                    le = 'le="+Inf"' if bound == float('inf') else f'le="{bound}"'
+                    lines.append(f"{family.name}_bucket{_format_labels(family.label_names, values, le)} {cumulative}")
+                lines.append(f"{family.name}_sum{_format_labels(family.label_names, values)} {child.sum}")
+                lines.append(f"{family.name}_count{_format_labels(family.label_names, values)} {child.count}")
+        for name, (help_text, callback) in self.gauges.items():
+            try:
+                value = callback()
+            except Exception as e:
+                logger.warning(f"Gauge {name} failed: {e}")
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+# Shared by every module so one endpoint exposes the whole pipeline
+METRICS = MetricsRegistry()
+
+
+class Profiler:
+    """cProfile session that can be switched on and off while the bot runs"""
+
+    def __init__(self, profile_dir='profiles'):
+        self.profile_dir = profile_dir
+        self.profile = None
+        self.started_at = None
+
+    @property
+    def running(self):
+        return self.profile is not None
+
+    def start(self):
+        if self.profile is None:
+            self.profile = cProfile.Profile()
+            self.started_at = datetime.now()
+            self.profile.enable()
+            logger.info("Profiler started")
+
+    def stop(self, top=30):
+        """Stop profiling, dump the stats file and return (path, top functions report)"""
+        if self.profile is None:
+            return None, ''
+        self.profile.disable()
+        os.makedirs(self.profile_dir, exist_ok=True)
+        path = os.path.join(self.profile_dir, f"profile-{self.started_at.strftime('%Y%m%d-%H%M%S')}.prof")
+        self.profile.dump_stats(path)
+
+        report = io.StringIO()
+        pstats.Stats(self.profile, stream=report).sort_stats('cumulative').print_stats(top)
+        self.profile = None
+        logger.info(f"Profiler stopped, stats written to {path}")
+        return path, report.getvalue()
+
+    def toggle(self):
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+
+class MetricsServer:
+    """Local HTTP endpoint serving /metrics and the profiler switch.
+
+    GET /metrics returns the registry; POST /profile/start and
+    /profile/stop control the profiler, and stop answers with the top
+    functions by cumulative time.
+    """
+
+    def __init__(self, registry=METRICS, host='127.0.0.1', port=9108, profiler=None):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.profiler = profiler or Profiler()
+        self._runner = None
+
+    async def start(self):
+        from aiohttp import web
+
+        async def metrics(request):
+            return web.Response(text=self.registry.render(), content_type='text/plain', charset='utf-8')
+
+        async def profile_start(request):
+            self.profiler.start()
+            return web.Response(text="profiling\n")
+
+        async def profile_stop(request):
+            path, report = self.profiler.stop()
+            if path is None:
+                return web.Response(text="profiler was not running\n", status=409)
+            return web.Response(text=f"{path}\n\n{report}")
+
+        app = web.Application()
+        app.router.add_get('/metrics', metrics)
+        app.router.add_post('/profile/start', profile_start)
+        app.router.add_post('/profile/stop', profile_stop)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        logger.info(f"Metrics endpoint on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self.profiler.running:
+            self.profiler.stop()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
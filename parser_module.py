@@ -0,0 +1,379 @@
+import re
+import sys
+import logging
+import threading
+from bs4 import BeautifulSoup
+from keyword_module import KeywordMatcher
+from listing_module import Listing
+
+try:
+    from lxml import etree
+    import lxml.html
+except ImportError:  # lxml is optional; BeautifulSoup stays available
+    etree = None
+
+logger = logging.getLogger(__name__)
+
+PRICE_RE = re.compile(r'(\d[\d.,]*)')
+
+# Titles eBay uses for placeholder cards rather than real listings
+PLACEHOLDER_TITLES = {'shop on ebay', 'new listing', 'newly listed', 'sponsored'}
+
+# In priority order, so more specific materials win over "leather"
+UPPER_MATERIALS = [
+    ('patent leather', 'Patent Leather'),
+    ('synthetic', 'Synthetic'),
+    ('mesh', 'Mesh'),
+    ('nubuck', 'Nubuck'),
+    ('fabric', 'Fabric'),
+    ('faux leather', 'Faux Leather'),
+    ('leather', 'Leather'),
+]
+
+MATERIAL_MATCHER = KeywordMatcher({keyword: {rank} for rank, (keyword, _) in enumerate(UPPER_MATERIALS)})
+
+
+def parse_price(price_text):
+    """Extract price from text"""
+    if not price_text:
+        return 0.0
+
+    # Remove currency symbols and extract number
+    # Handles cases like "$1,234.56" and "$12.00 to $20.00"
+    price_match = PRICE_RE.search(price_text)
+    if price_match:
+        price_str = price_match.group(1).replace(',', '')
+        try:
+            return float(price_str)
+        except ValueError:
+            return 0.0
+    return 0.0
+
+
+def infer_upper_material(title):
+    """Infer upper material from title (direct extraction requires product page visit)"""
+    ranks = MATERIAL_MATCHER.tags(title)
+    return UPPER_MATERIALS[min(ranks)][1] if ranks else 'Unknown'
+
+
+def clean_image_url(image_url):
+    """Make protocol-relative image URLs absolute"""
+    if image_url and image_url.startswith('//'):
+        return 'https:' + image_url
+    return image_url
+
+
+def build_listing(title, price, condition, url, image_url):
+    """Assemble the Listing every parser backend returns"""
+    # Listing strips the tracking parameters from the URL
+    return Listing(title, price, condition, infer_upper_material(title), url, clean_image_url(image_url))
+
+
+class BeautifulSoupParser:
+    """Reference parser built on BeautifulSoup's html.parser"""
+
+    name = 'html.parser'
+
+    def parse(self, html_content):
+        """Parse eBay search results and extract upper material and condition"""
+        soup = BeautifulSoup(html_content, 'html.parser')
+        listings = []
+
+        # Main container for each listing is <li> with class 's-item'
+        for item in soup.find_all('li', class_='s-item'):
+            try:
+                # Skip sponsored items and ads
+                hl_tag = item.find('span', class_='s-item__hl-tag')
+                if hl_tag and "SPONSORED" in hl_tag.get_text(strip=True).upper():
+                    continue
+
+                # Check for "Shop on eBay" and similar titles from the primary link
+                link_elem = item.find('a', class_='s-item__link')
+                if not link_elem:
+                    continue
+
+                # Extract title from within the 's-item__title' div inside the link
+                title_div_elem = link_elem.find('div', class_='s-item__title')
+                if not title_div_elem:
+                    continue
+
+                # The actual title text is within a span with role="heading"
+                title_span_elem = title_div_elem.find('span', {'role': 'heading', 'aria-level': '3'})
+                if not title_span_elem:
+                    continue
+
+                title = title_span_elem.get_text(strip=True)
+                if title.lower() in PLACEHOLDER_TITLES:
+                    continue
+
+                url = link_elem.get('href')
+                if not url:
+                    continue
+
+                # Price is usually a span, sometimes a price range or a div
+                price_elem = (item.find('span', class_='s-item__price')
+                              or item.find('span', class_='s-price-range')
+                              or item.find('div', class_='s-item__price'))
+                if not price_elem:
+                    continue
+
+                price = parse_price(price_elem.get_text(strip=True))
+                if price <= 0:
+                    continue
+
+                # Condition is a 'SECONDARY_INFO' span within 's-item__subtitle'
+                subtitle_elem = item.find('div', class_='s-item__subtitle')
+                condition_elem = subtitle_elem.find('span', class_='SECONDARY_INFO') if subtitle_elem else None
+                condition = condition_elem.get_text(strip=True) if condition_elem else 'Unknown'
+
+                # The img tag is inside 's-item__image-wrapper' or directly within 's-item__image'
+                wrapper_elem = item.find('div', class_='s-item__image-wrapper')
+                img_elem = wrapper_elem.find('img') if wrapper_elem else None
+                if not img_elem:
+                    img_elem = item.find('div', class_='s-item__image').find('img')  # Fallback
+
+                image_url = img_elem.get('src') if img_elem else None
+
+                listings.append(build_listing(title, price, condition, url, image_url))
+
+            except Exception as e:
+                logger.warning(f"Error parsing listing: {e}", extra={'sample': 'parse_error'})
+                continue
+
+        return listings
+
+
+def _class_xpath(tag, class_name, prefix='.//'):
+    """Precompile an XPath matching tag elements carrying class_name as a class token"""
+    return etree.XPath(
+        f"{prefix}{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+    )
+
+
+class LxmlParser:
+    """Fast parser using lxml with precompiled XPath selectors.
+
+    Mirrors BeautifulSoupParser step for step, including which listings are
+    skipped, so both backends return identical listings.
+    """
+
+    name = 'lxml'
+
+    def __init__(self):
+        if etree is None:
+            raise ImportError("lxml is not installed")
+        self.items = _class_xpath('li', 's-item', prefix='//')
+        self.hl_tag = _class_xpath('span', 's-item__hl-tag')
+        self.link = _class_xpath('a', 's-item__link')
+        self.title_div = _class_xpath('div', 's-item__title')
+        self.title_span = etree.XPath(".//span[@role='heading' and @aria-level='3']")
+        self.price_span = _class_xpath('span', 's-item__price')
+        self.price_range = _class_xpath('span', 's-price-range')
+        self.price_div = _class_xpath('div', 's-item__price')
+        self.subtitle = _class_xpath('div', 's-item__subtitle')
+        self.secondary_info = _class_xpath('span', 'SECONDARY_INFO')
+        self.image_wrapper = _class_xpath('div', 's-item__image-wrapper')
+        self.image_div = _class_xpath('div', 's-item__image')
+        self.img = etree.XPath('.//img')
+        self.text = etree.XPath('.//text()')
+
+    @staticmethod
+    def _first(selector, elem):
+        found = selector(elem)
+        return found[0] if found else None
+
+    def _get_text(self, elem):
+        """Equivalent of BeautifulSoup's get_text(strip=True)"""
+        return ''.join(text.strip() for text in self.text(elem))
+
+    @staticmethod
+    def _document(html_content):
+        try:
+            return lxml.html.document_fromstring(html_content)
+        except ValueError:
+            # Unicode input with an XML encoding declaration has to go in as bytes
+            return lxml.html.document_fromstring(html_content.encode('utf-8'))
+
+    def parse_item(self, item):
+        """Return the listing for one s-item element, or None if it should be skipped"""
+        first = self._first
+
+        hl_tag = first(self.hl_tag, item)
+        if hl_tag is not None and "SPONSORED" in self._get_text(hl_tag).upper():
+            return None
+
+        link_elem = first(self.link, item)
+        if link_elem is None:
+            return None
+
+        title_div_elem = first(self.title_div, link_elem)
+        if title_div_elem is None:
+            return None
+
+        title_span_elem = first(self.title_span, title_div_elem)
+        if title_span_elem is None:
+            return None
+
+        title = self._get_text(title_span_elem)
+        if title.lower() in PLACEHOLDER_TITLES:
+            return None
+
+        url = link_elem.get('href')
+        if not url:
+            return None
+
+        price_elem = first(self.price_span, item)
+        if price_elem is None:
+            price_elem = first(self.price_range, item)
+        if price_elem is None:
+            price_elem = first(self.price_div, item)
+        if price_elem is None:
+            return None
+
+        price = parse_price(self._get_text(price_elem))
+        if price <= 0:
+            return None
+
+        subtitle_elem = first(self.subtitle, item)
+        condition_elem = first(self.secondary_info, subtitle_elem) if subtitle_elem is not None else None
+        condition = self._get_text(condition_elem) if condition_elem is not None else 'Unknown'
+
+        wrapper_elem = first(self.image_wrapper, item)
+        img_elem = first(self.img, wrapper_elem) if wrapper_elem is not None else None
+        if img_elem is None:
+            image_div_elem = first(self.image_div, item)
+            if image_div_elem is None:
+                raise AttributeError("listing has no image container")
+            img_elem = first(self.img, image_div_elem)
+
+        image_url = img_elem.get('src') if img_elem is not None else None
+
+        return build_listing(title, price, condition, url, image_url)
+
+    def parse(self, html_content):
+        """Parse eBay search results and extract upper material and condition"""
+        listings = []
+        for item in self.items(self._document(html_content)):
+            try:
+                listing = self.parse_item(item)
+            except Exception as e:
+                logger.warning(f"Error parsing listing: {e}", extra={'sample': 'parse_error'})
+                continue
+            if listing is not None:
+                listings.append(listing)
+        return listings
+
+
+class StreamingListingParser:
+    """Incremental lxml parser fed with response chunks.
+
+    Each s-item listing is extracted as soon as its closing tag arrives and
+    the finished element is dropped, so memory per page stays bounded no
+    matter how large the document is.
+    """
+
+    def __init__(self, encoding=None):
+        self.extractor = LxmlParser()
+        self._parser = etree.HTMLPullParser(events=('end',), tag='li', encoding=encoding)
+
+    def feed(self, data):
+        """Feed a chunk of the document and return listings completed by it"""
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self):
+        """Finish the document and return any remaining listings"""
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self):
+        listings = []
+        for _, elem in self._parser.read_events():
+            if 's-item' not in (elem.get('class') or '').split():
+                continue
+            try:
+                listing = self.extractor.parse_item(elem)
+            except Exception as e:
+                logger.warning(f"Error parsing listing: {e}", extra={'sample': 'parse_error'})
+                listing = None
+            if listing is not None:
+                listings.append(listing)
+
+            # Free the finished item and the siblings before it
+            elem.clear(keep_tail=True)
+            parent = elem.getparent()
+            while parent is not None and elem.getprevious() is not None:
+                del parent[0]
+        return listings
+
+
+def parse_streaming(html_content, chunk_size=4096):
+    """Run StreamingListingParser over an in-memory document in chunks"""
+    data = html_content.encode('utf-8') if isinstance(html_content, str) else html_content
+    parser = StreamingListingParser('utf-8')
+    listings = []
+    for start in range(0, len(data), chunk_size):
+        listings.extend(parser.feed(data[start:start + chunk_size]))
+    listings.extend(parser.close())
+    return listings
+
+
+PARSERS = {
+    'html.parser': BeautifulSoupParser,
+    'lxml': LxmlParser,
+}
+
+# One parser per worker thread or process, built on first use; compiled
+# XPath objects should not be shared between threads
+_worker_state = threading.local()
+
+
+def parse_compact(backend_name, html_content):
+    """Parse in an executor worker and return listings as tuples to keep pickling cheap"""
+    parsers = getattr(_worker_state, 'parsers', None)
+    if parsers is None:
+        parsers = _worker_state.parsers = {}
+    parser = parsers.get(backend_name)
+    if parser is None:
+        parser = parsers[backend_name] = get_parser(backend_name)
+    return [listing.as_tuple() for listing in parser.parse(html_content)]
+
+
+def get_parser(name='lxml'):
+    """Return a parser backend, falling back to BeautifulSoup if it is unavailable"""
+    parser_class = PARSERS.get(name)
+    if parser_class is None:
+        logger.warning(f"Unknown parser backend '{name}', using html.parser")
+        parser_class = BeautifulSoupParser
+    try:
+        return parser_class()
+    except ImportError as e:
+        logger.warning(f"Parser backend '{name}' unavailable ({e}), using html.parser")
+        return BeautifulSoupParser()
+
+
+def check_parity(html_content, backends=('html.parser', 'lxml')):
+    """Parse html_content with each backend and return the names that disagree with the first"""
+    results = {name: PARSERS[name]().parse(html_content) for name in backends}
+    if etree is not None:
+        results['lxml streaming'] = parse_streaming(html_content)
+    reference = results[backends[0]]
+    return [name for name, listings in results.items() if listings != reference]
+
+
+# Parity check against saved search pages
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    failures = 0
+    for path in sys.argv[1:]:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        mismatched = check_parity(html)
+        if mismatched:
+            failures += 1
+            print(f"❌ {path}: {', '.join(mismatched)} disagree with html.parser")
+        else:
+            print(f"✅ {path}: backends agree")
+
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,87 @@
+import logging
+from keyword_module import KeywordMatcher, normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Search operators that make a term's results more than "all of these words"
+OPERATOR_CHARS = set('-"()*,')
+
+
+def term_tokens(term):
+    """Return the word set of a plain term, or None if it uses search operators"""
+    text = normalize_text(term)
+    if any(char in OPERATOR_CHARS for char in text):
+        return None
+    return frozenset(text.split())
+
+
+class QueryPlanner:
+    """Fetch overlapping search terms once and fan results out locally.
+
+    A term whose words include every word of another term ("Air Jordan 1"
+    and "Jordan 1") only returns a subset of that term's results, so only
+    the broadest term is fetched. Its listings are routed to the narrower
+    terms by matching their words against the title in one keyword pass.
+    Fetching a query moves its pagination markers, so it always serves
+    every term it covers, even those that are not due yet; otherwise the
+    listings no due term claims would fall behind the markers for good.
+    Terms using search operators are always fetched on their own.
+    """
+
+    def __init__(self, search_terms):
+        self.set_terms(search_terms)
+
+    def set_terms(self, search_terms):
+        """Work out which configured term covers each term"""
+        self.search_terms = list(search_terms)
+        self.tokens = {term: term_tokens(term) for term in self.search_terms}
+
+        order = {term: index for index, term in enumerate(self.search_terms)}
+        self.root = {}
+        for term in self.search_terms:
+            tokens = self.tokens[term]
+            if not tokens:
+                self.root[term] = term
+                continue
+            # The broadest covering term wins, earlier terms break ties
+            covering = [other for other in self.search_terms if self.tokens[other] and self.tokens[other] <= tokens]
+            self.root[term] = min(covering, key=lambda other: (len(self.tokens[other]), order[other]))
+
+        # Every configured term each query serves, in config order
+        self.covered = {}
+        for term in self.search_terms:
+            self.covered.setdefault(self.root[term], []).append(term)
+
+        words = {word for tokens in self.tokens.values() if tokens for word in tokens}
+        self.matcher = KeywordMatcher({word: {word} for word in words})
+
+        shared = sum(1 for term, root in self.root.items() if term != root)
+        if shared:
+            logger.info(f"Query plan: {len(self.search_terms) - shared} queries cover {len(self.search_terms)} terms")
+
+    def plan(self, search_terms):
+        """Return {query to fetch: [terms it serves]} for the requested terms"""
+        plan = {}
+        for term in search_terms:
+            query = self.root.get(term, term)
+            if query not in plan:
+                plan[query] = list(self.covered.get(query, [term]))
+        return plan
+
+    def route(self, listing, query, terms):
+        """Return the narrowest of terms whose words all appear in the listing title.
+
+        terms are the terms planned under query, the search that returned
+        the listing. eBay matches more loosely than whole words, so the query
+        itself keeps any listing no narrower term claims, provided it is
+        one of terms. Returns None when no planned term wants it.
+        """
+        words = self.matcher.tags(listing.title_lower)
+        best = None
+        for term in terms:
+            tokens = self.tokens.get(term)
+            if tokens and tokens <= words and (best is None or len(tokens) > len(self.tokens[best])):
+                best = term
+        if best is None and query in terms:
+            best = query
+        return best
@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from metrics_module import METRICS
+
+logger = logging.getLogger(__name__)
+
+SEND_SECONDS = METRICS.histogram('sneaker_post_seconds', 'Discord message send latency')
+
+# Discord accepts at most 10 embeds per message
+MAX_EMBEDS_PER_MESSAGE = 10
+
+
+class DeferredEmbed:
+    """An embed built on first use and then shared by every channel it goes to"""
+
+    __slots__ = ('build', 'args', 'embed')
+
+    def __init__(self, build, *args):
+        self.build = build
+        self.args = args
+        self.embed = None
+
+    def resolve(self):
+        if self.embed is None:
+            self.embed = self.build(*self.args)
+            self.build = self.args = None
+        return self.embed
+
+
+class DealPoster:
+    """Queue-backed consumer that posts deal embeds to Discord channels.
+
+    The monitor loop only enqueues; a separate task packs consecutive embeds
+    for the same channel into one message. discord.py already paces sends
+    with its per-route rate-limit buckets and retries 429s itself, so the
+    poster adds only min_send_interval and, should a 429 still surface, waits
+    out its retry_after before sending the same batch again.
+    Any object with an ``async send(embeds=...)`` method works as a channel.
+    Embeds may be DeferredEmbeds, which are only built when they are sent.
+    """
+
+    def __init__(self, max_embeds_per_message=MAX_EMBEDS_PER_MESSAGE, min_send_interval=0.0,
+                 max_queue_size=500):
+        self.max_embeds_per_message = max(1, min(max_embeds_per_message, MAX_EMBEDS_PER_MESSAGE))
+        self.min_send_interval = min_send_interval
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+        self._pending = deque()
+        self._in_flight = 0
+        self._task = None
+        self._next_send_at = 0.0
+        self.messages_sent = 0
+        self.deals_posted = 0
+        self.deals_dropped = 0
+
+    @property
+    def depth(self):
+        """Number of deals waiting to be posted"""
+        return self.queue.qsize() + len(self._pending) + self._in_flight
+
+    def start(self):
+        """Start the consumer task on the running loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout=30):
+        """Give queued deals a chance to go out, then cancel the consumer"""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._drained(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Dropping {self.depth} unposted deals on shutdown")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _drained(self):
+        while self.depth:
+            await asyncio.sleep(0.1)
+
+    def submit(self, channel, embed, label=''):
+        """Queue an embed for posting without waiting on Discord"""
+        try:
+            self.queue.put_nowait((channel, embed, label))
+            return True
+        except asyncio.QueueFull:
+            self.deals_dropped += 1
+            logger.warning(f"Posting queue full, dropped deal: {label}", extra={'sample': 'dropped_deal'})
+            return False
+
+    def _next_batch(self):
+        """Pop up to max_embeds_per_message pending items for one channel"""
+        while not self.queue.empty():
+            self._pending.append(self.queue.get_nowait())
+
+        channel = self._pending[0][0]
+        batch, rest = [], deque()
+        while self._pending:
+            item = self._pending.popleft()
+            if item[0] is channel and len(batch) < self.max_embeds_per_message:
+                batch.append(item)
+            else:
+                rest.append(item)
+        self._pending = rest
+        return channel, batch
+
+    @staticmethod
+    def _retry_after(exc):
+        """Seconds to wait according to a rate-limited response, if any"""
+        retry_after = getattr(exc, 'retry_after', None)
+        if retry_after is not None:
+            return float(retry_after)
+        response = getattr(exc, 'response', None)
+        headers = getattr(response, 'headers', None) or {}
+        for header in ('X-RateLimit-Reset-After', 'Retry-After'):
+            if header in headers:
+                try:
+                    return float(headers[header])
+                except ValueError:
+                    pass
+        return None
+
+    async def _send(self, channel, batch):
+        try:
+            embeds = [embed.resolve() if isinstance(embed, DeferredEmbed) else embed for _, embed, _ in batch]
+        except Exception as e:
+            logger.error(f"Error building {len(batch)} deal embeds: {e}")
+            return False
+        while True:
+            wait = self._next_send_at - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                with SEND_SECONDS.time():
+                    await channel.send(embeds=embeds)
+            except Exception as e:
+                if getattr(e, 'status', None) != 429:
+                    logger.error(f"Error posting {len(embeds)} deals: {e}")
+                    return False
+                retry_after = self._retry_after(e) or 1.0
+                logger.warning(f"Rate limited by Discord, retrying in {retry_after:.1f}s")
+                self._next_send_at = time.monotonic() + retry_after
+                continue
+
+            self._next_send_at = max(self._next_send_at, time.monotonic() + self.min_send_interval)
+            return True
+
+    async def _run(self):
+        while True:
+            if not self._pending:
+                self._pending.append(await self.queue.get())
+            channel, batch = self._next_batch()
+            self._in_flight = len(batch)
+            try:
+                sent = await self._send(channel, batch)
+            finally:
+                self._in_flight = 0
+            if sent:
+                self.messages_sent += 1
+                self.deals_posted += len(batch)
+                for _, _, label in batch:
+                    logger.info(f"Posted new deal: {label}", extra={'sample': 'posted_deal'})
+            else:
+                self.deals_dropped += len(batch)
@@ -0,0 +1,242 @@
+import math
+import logging
+from datetime import datetime, timedelta, timezone
+from keyword_module import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+# Silhouettes the index knows about: model name -> title keywords
+MODEL_FAMILIES = {
+    'jordan 1': ['jordan 1', 'air jordan 1', 'aj1', 'aj 1', 'jordan retro 1'],
+    'jordan 3': ['jordan 3', 'air jordan 3', 'aj3', 'aj 3'],
+    'jordan 4': ['jordan 4', 'air jordan 4', 'aj4', 'aj 4'],
+    'jordan 11': ['jordan 11', 'air jordan 11', 'aj11', 'aj 11'],
+    'dunk low': ['dunk low', 'sb dunk low'],
+    'dunk high': ['dunk high', 'sb dunk high'],
+    'air force 1': ['air force 1', 'af1'],
+    'yeezy 350': ['yeezy 350', 'yeezy boost 350'],
+}
+
+# Families priced very differently by cut; the cut becomes part of the model
+CUT_FAMILIES = {'jordan 1'}
+CUTS = ['low', 'mid', 'high']
+
+# Collaborations and colorways that move the market price of a silhouette
+QUALIFIERS = {
+    'travis scott': ['travis scott', 'cactus jack'],
+    'off white': ['off white', 'off-white'],
+    'fragment': ['fragment'],
+    'union': ['union'],
+    'chicago': ['chicago'],
+    'bred': ['bred'],
+    'panda': ['panda'],
+    'university blue': ['university blue', 'unc'],
+    'mocha': ['mocha'],
+}
+
+
+class ModelNormalizer:
+    """Maps a listing title to a normalized model key in one keyword pass.
+
+    The key is the silhouette, its cut where that matters and any known
+    collaboration or colorway, e.g. "jordan 1 high|travis scott". Titles
+    with no known silhouette get None and are not indexed.
+    """
+
+    def __init__(self, families=None, qualifiers=None):
+        families = MODEL_FAMILIES if families is None else families
+        qualifiers = QUALIFIERS if qualifiers is None else qualifiers
+
+        keyword_tags = {}
+        for family, keywords in families.items():
+            for keyword in keywords:
+                keyword_tags.setdefault(keyword, set()).add(('family', family))
+        for cut in CUTS:
+            keyword_tags.setdefault(cut, set()).add(('cut', cut))
+        for qualifier, keywords in qualifiers.items():
+            for keyword in keywords:
+                keyword_tags.setdefault(keyword, set()).add(('qualifier', qualifier))
+        self.matcher = KeywordMatcher(keyword_tags)
+
+    def model_key(self, title):
+        """Return the normalized model key for title, or None"""
+        tags = self.matcher.tags(title)
+        families = sorted(value for kind, value in tags if kind == 'family')
+        if not families:
+            return None
+        # Prefer the most specific family when keywords overlap ("sb dunk low" vs "dunk low")
+        family = max(families, key=len)
+
+        key = family
+        if family in CUT_FAMILIES:
+            cuts = [value for kind, value in tags if kind == 'cut']
+            if len(cuts) == 1:
+                key = f"{family} {cuts[0]}"
+        qualifiers = sorted(value for kind, value in tags if kind == 'qualifier')
+        if qualifiers:
+            key += '|' + '+'.join(qualifiers)
+        return key
+
+
+class QuantileSketch:
+    """Mergeable log-bucket histogram with bounded relative error.
+
+    Prices land in buckets whose bounds grow by a constant factor, so any
+    quantile is within relative_accuracy of the true value. Sketches for
+    different days merge by adding bucket counts, and a whole window stays
+    a few dozen buckets per model however many listings it covers.
+    """
+
+    def __init__(self, relative_accuracy=0.02):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.count = 0
+
+    def bucket(self, value):
+        """Bucket index for a positive value"""
+        return math.ceil(math.log(value) / self.log_gamma)
+
+    def bucket_value(self, index):
+        """Representative value of a bucket"""
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add_bucket(self, index, count=1):
+        self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += count
+        if self.buckets[index] <= 0:
+            self.count -= self.buckets.pop(index)
+
+    def add(self, value, count=1):
+        if value > 0:
+            self.add_bucket(self.bucket(value), count)
+
+    def merge(self, other, sign=1):
+        """Add (or with sign=-1 subtract) another sketch's counts"""
+        for index, count in other.buckets.items():
+            self.add_bucket(index, sign * count)
+
+    def quantiles(self, qs):
+        """Return the values at each of the increasing quantiles qs"""
+        if not self.count:
+            return [None] * len(qs)
+        ranks = [q * (self.count - 1) for q in qs]
+        results = []
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            while len(results) < len(ranks) and seen > ranks[len(results)]:
+                results.append(self.bucket_value(index))
+            if len(results) == len(ranks):
+                break
+        return results
+
+
+class PriceIndex:
+    """Rolling per-model price quantiles built from daily sketches.
+
+    Each saved listing adds its price to today's sketch for its model. The
+    window sketch is kept merged, so adding is O(1), and a model's median
+    and quartiles are recomputed only when its window changes. Lookups in
+    the hot path are a single dict read. Days falling out of the window
+    are subtracted from the merged sketch; nothing rescans listings.
+    """
+
+    QUANTILES = (0.25, 0.5, 0.75)
+
+    def __init__(self, window_days=30, min_samples=10, relative_accuracy=0.02, normalizer=None):
+        self.window_days = window_days
+        self.min_samples = min_samples
+        self.relative_accuracy = relative_accuracy
+        self.normalizer = normalizer or ModelNormalizer()
+        self.daily = {}    # (model, day) -> QuantileSketch
+        self.window = {}   # model -> QuantileSketch over the whole window
+        self.summaries = {}  # model -> (count, p25, median, p75)
+
+    @staticmethod
+    def today():
+        return datetime.now(timezone.utc).strftime('%Y-%m-%d')
+
+    def cutoff_day(self, today=None):
+        """First day still inside the window"""
+        today = datetime.strptime(today or self.today(), '%Y-%m-%d')
+        return (today - timedelta(days=self.window_days - 1)).strftime('%Y-%m-%d')
+
+    def model_key(self, title):
+        return self.normalizer.model_key(title)
+
+    def _sketch(self, store, key):
+        sketch = store.get(key)
+        if sketch is None:
+            sketch = store[key] = QuantileSketch(self.relative_accuracy)
+        return sketch
+
+    def _summarize(self, models):
+        for model in models:
+            sketch = self.window.get(model)
+            if sketch is None or not sketch.count:
+                self.window.pop(model, None)
+                self.summaries.pop(model, None)
+                continue
+            self.summaries[model] = (sketch.count, *sketch.quantiles(self.QUANTILES))
+
+    def load(self, rows):
+        """Rebuild from persisted (model, day, bucket, count) rows"""
+        self.daily.clear()
+        self.window.clear()
+        self.summaries.clear()
+        for model, day, bucket, count in rows:
+            self._sketch(self.daily, (model, day)).add_bucket(bucket, count)
+            self._sketch(self.window, model).add_bucket(bucket, count)
+        self._summarize(list(self.window))
+
+    def add_many(self, listings, day=None):
+        """Add listing prices to today's sketches.
+
+        Returns aggregated (model, day, bucket, count) rows for the store to
+        persist. Listings that already have a model key are not re-normalized.
+        """
+        day = day or self.today()
+        counts = {}
+        for listing in listings:
+            model = listing.model or self.model_key(listing.title)
+            price = listing.price
+            if model is None or not price or price <= 0:
+                continue
+            daily = self._sketch(self.daily, (model, day))
+            bucket = daily.bucket(price)
+            daily.add_bucket(bucket)
+            self._sketch(self.window, model).add_bucket(bucket)
+            counts[(model, day, bucket)] = counts.get((model, day, bucket), 0) + 1
+        self._summarize({model for model, _, _ in counts})
+        return [(model, day, bucket, count) for (model, day, bucket), count in counts.items()]
+
+    def expire(self, today=None):
+        """Drop days that have left the window and return how many were dropped"""
+        cutoff = self.cutoff_day(today)
+        expired = [key for key in self.daily if key[1] < cutoff]
+        for model, day in expired:
+            self._sketch(self.window, model).merge(self.daily.pop((model, day)), sign=-1)
+        self._summarize({model for model, _ in expired})
+        return len(expired)
+
+    def lookup(self, model):
+        """Return (count, p25, median, p75) for model once it has enough samples"""
+        summary = self.summaries.get(model)
+        if summary is None or summary[0] < self.min_samples:
+            return None
+        return summary
+
+    def reference_price(self, model):
+        """Median price of model over the window, or None"""
+        summary = self.lookup(model)
+        return summary[2] if summary else None
+
+    def stats(self):
+        """Return index size for logging"""
+        return {
+            'models': len(self.summaries),
+            'ready_models': sum(1 for summary in self.summaries.values() if summary[0] >= self.min_samples),
+            'buckets': sum(len(sketch.buckets) for sketch in self.daily.values()),
+        }
@@ -7,7 +7,7 @@ Includes setup validation and better error handling
 import sys
 import os
 import json
-import logging
+import logging_module
 from bs4 import BeautifulSoup
 from pathlib import Path
 
@@ -73,14 +73,7 @@ def validate_config():
 
 def setup_logging():
     """Setup logging configuration"""
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('bot.log'),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+    logging_module.setup_logging()
 
 def main():
     """Main function with setup validation"""
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Async token bucket that releases one request every 1/rate seconds"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class RequestScheduler:
+    """Global concurrency limit plus a per-host token bucket.
+
+    The bucket rate is derived from the number of requests expected in a
+    cycle so they are spread across the check interval instead of all
+    hitting eBay at once, capped by max_requests_per_second.
+    """
+
+    # Leave part of the interval free so a cycle finishes before the next starts
+    SPREAD_FRACTION = 0.8
+
+    def __init__(self, max_concurrency=4, max_requests_per_second=1.0, burst=1):
+        self.max_concurrency = max_concurrency
+        self.max_requests_per_second = max_requests_per_second
+        self.burst = burst
+        self.rate = max_requests_per_second
+        self.buckets = {}
+        self.waiting = 0
+        self.max_queue_depth = 0
+        self._semaphore = None
+
+    def configure(self, max_concurrency, max_requests_per_second):
+        """Apply new limits; requests already holding a slot finish under the old ones"""
+        if max_concurrency != self.max_concurrency:
+            self.max_concurrency = max_concurrency
+            self._semaphore = None
+        self.max_requests_per_second = max_requests_per_second
+        self.rate = min(self.rate, max_requests_per_second)
+        for bucket in self.buckets.values():
+            bucket.rate = self.rate
+
+    def plan_cycle(self, request_count, interval_seconds):
+        """Pick the request rate that spreads request_count over the interval"""
+        if request_count <= 0 or interval_seconds <= 0:
+            self.rate = self.max_requests_per_second
+        else:
+            spread_rate = request_count / (interval_seconds * self.SPREAD_FRACTION)
+            self.rate = min(self.max_requests_per_second, spread_rate)
+        for bucket in self.buckets.values():
+            bucket.rate = self.rate
+        self.max_queue_depth = 0
+
+    def _bucket(self, host):
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    @asynccontextmanager
+    async def slot(self, url):
+        """Hold a request slot for url, waiting on the host bucket and the global limit"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        semaphore = self._semaphore
+
+        self.waiting += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.waiting)
+        try:
+            await self._bucket(urlparse(url).netloc).acquire()
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+class AdaptivePollSchedule:
+    """Per-term polling intervals that follow each term's listing velocity.
+
+    Terms that keep turning up new listings are polled faster and quiet terms
+    back off, always within [min_interval, max_interval]. Due times are wall
+    clock timestamps so the state can be persisted and restored. Velocity is
+    measured against the keys each term itself returned recently, not the
+    posted deals, so listings that never pass the filters do not keep a term
+    pinned at min_interval.
+    """
+
+    # Recent listing keys remembered per term for counting new listings
+    SEEN_PER_TERM = 1000
+
+    def __init__(self, search_terms, base_interval=180, min_interval=60, max_interval=900,
+                 speedup=0.5, backoff=1.5):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.speedup = speedup
+        self.backoff = backoff
+        self.state = {}
+        self.seen = {}
+        self.set_terms(search_terms)
+
+    def _clamp(self, interval):
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def configure(self, base_interval, min_interval, max_interval):
+        """Apply new interval bounds, pulling current intervals inside them"""
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        for state in self.state.values():
+            clamped = self._clamp(state['interval'])
+            state['next_due'] += clamped - state['interval']
+            state['interval'] = clamped
+
+    def set_terms(self, search_terms):
+        """Track exactly these terms; new ones are due immediately"""
+        now = time.time()
+        self.state = {
+            term: self.state.get(term, {'interval': self._clamp(self.base_interval), 'next_due': now})
+            for term in search_terms
+        }
+        self.seen = {term: keys for term, keys in self.seen.items() if term in self.state}
+
+    def restore(self, saved):
+        """Load persisted state for terms that are still configured"""
+        for term, (interval, next_due) in saved.items():
+            if term in self.state:
+                self.state[term] = {'interval': self._clamp(interval), 'next_due': next_due}
+
+    def due_terms(self, now=None):
+        """Return the terms whose next poll time has passed"""
+        now = time.time() if now is None else now
+        return [term for term, state in self.state.items() if state['next_due'] <= now]
+
+    def count_new(self, term, keys):
+        """Remember the listing keys a poll of term returned and count those it had not returned before.
+
+        Returns None on a term's first poll since startup, which only sets
+        the baseline.
+        """
+        seen = self.seen.get(term)
+        first_poll = seen is None
+        if first_poll:
+            seen = self.seen[term] = {}
+        new_count = 0
+        for key in keys:
+            if key not in seen:
+                new_count += 1
+                seen[key] = None
+        # Dicts keep insertion order, so the oldest keys go first
+        for key in list(seen)[:max(0, len(seen) - self.SEEN_PER_TERM)]:
+            del seen[key]
+        return None if first_poll else new_count
+
+    def record_result(self, term, new_count, now=None):
+        """Adjust a term's interval after a poll that found new_count new listings.
+
+        A new_count of None keeps the interval and only schedules the next poll.
+        """
+        state = self.state.get(term)
+        if state is None:
+            return
+        now = time.time() if now is None else now
+        if new_count is not None:
+            factor = self.speedup if new_count > 0 else self.backoff
+            state['interval'] = self._clamp(state['interval'] * factor)
+        state['next_due'] = now + state['interval']
+
+    def snapshot(self, terms=None):
+        """Return (term, interval, next_due) rows for persistence"""
+        terms = self.state if terms is None else terms
+        return [(term, self.state[term]['interval'], self.state[term]['next_due'])
+                for term in terms if term in self.state]
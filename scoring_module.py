@@ -0,0 +1,163 @@
+import sys
+import time
+import sqlite3
+import logging
+from bisect import bisect_right
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; bisect handles the price lookups without it
+    np = None
+
+logger = logging.getLogger(__name__)
+
+MAX_SCORE = 10
+MIN_SCORE = 1
+
+# Price as a fraction of the model's market median: under 0.6 scores 10,
+# each step up loses a point, 1.3x the median and above scores 2
+RELATIVE_BREAKPOINTS = [0.6, 0.7, 0.8, 0.9, 1.0, 1.1, 1.2, 1.3]
+
+# Bonus points for popular models, used when the config has no bonus_groups
+DEFAULT_BONUS_GROUPS = [
+    {"keywords": ["jordan 1", "aj1", "air jordan 1"], "points": 1},
+    {"keywords": ["dunk low", "dunk high", "sb dunk"], "points": 1},
+    {"keywords": ["retro"], "points": 1},
+    {"keywords": ["off white", "travis scott", "fragment"], "points": 2},
+]
+
+
+def price_breakpoints(price_thresholds):
+    """Expand the named thresholds into a price ladder with one score step per breakpoint.
+
+    Each threshold gets a halfway step to the next one, plus one step below
+    the lowest, so the default 80/120/160/200 thresholds give the ladder
+    60, 80, 100, ..., 200 (scores 10 down to 2).
+    """
+    values = sorted(float(value) for value in price_thresholds.values())
+    if len(values) < 2:
+        return values
+
+    breakpoints = [values[0] - (values[1] - values[0]) / 2]
+    for low, high in zip(values, values[1:]):
+        breakpoints.extend([low, (low + high) / 2])
+    breakpoints.append(values[-1])
+    return breakpoints
+
+
+class DealScorer:
+    """Deal scoring compiled from the deal_scoring config section.
+
+    Price thresholds become a sorted breakpoint array and bonus groups become
+    bits in a mask with a precomputed points table, so a whole batch is
+    scored with one searchsorted/bisect per price and one lookup per mask.
+    Listings with a market reference price (the model's median from the
+    price index) are scored on their discount to it instead of on the
+    absolute price ladder.
+    """
+
+    def __init__(self, price_thresholds, bonus_groups=None, bonus_keywords=(), bonus_keyword_points=1):
+        self.breakpoints = price_breakpoints(price_thresholds)
+        self.base_scores = [max(MAX_SCORE - step, MIN_SCORE) for step in range(len(self.breakpoints) + 1)]
+        self.relative_scores = [max(MAX_SCORE - step, MIN_SCORE) for step in range(len(RELATIVE_BREAKPOINTS) + 1)]
+
+        groups = DEFAULT_BONUS_GROUPS if bonus_groups is None else bonus_groups
+        self.score_groups = [(list(group['keywords']), group['points']) for group in groups]
+
+        # Configured bonus keywords not already in a group count as one extra group
+        grouped = {keyword.lower() for keywords, _ in self.score_groups for keyword in keywords}
+        extra = [keyword for keyword in bonus_keywords if keyword.lower() not in grouped]
+        if extra and bonus_keyword_points:
+            self.score_groups.append((extra, bonus_keyword_points))
+
+        points = [points for _, points in self.score_groups]
+        self.mask_points = [
+            sum(points[bit] for bit in range(len(points)) if mask >> bit & 1)
+            for mask in range(1 << len(points))
+        ] if len(points) <= 16 else None
+        self.group_points = points
+
+        if np is not None:
+            self._np_breakpoints = np.asarray(self.breakpoints, dtype=float)
+            self._np_base_scores = np.asarray(self.base_scores, dtype=np.int64)
+            self._np_relative_breakpoints = np.asarray(RELATIVE_BREAKPOINTS, dtype=float)
+            self._np_relative_scores = np.asarray(self.relative_scores, dtype=np.int64)
+            self._np_mask_points = np.asarray(self.mask_points, dtype=np.int64) if self.mask_points else None
+
+    @classmethod
+    def from_config(cls, config):
+        """Build the scorer from the deal_scoring config section"""
+        return cls(config.PRICE_THRESHOLDS, config.BONUS_GROUPS, config.BONUS_KEYWORDS, config.BONUS_KEYWORD_POINTS)
+
+    def bonus(self, mask):
+        """Points for a bitmask of matched score groups"""
+        if self.mask_points is not None:
+            return self.mask_points[mask]
+        return sum(points for bit, points in enumerate(self.group_points) if mask >> bit & 1)
+
+    def score(self, price, mask=0, reference=None):
+        """Score one listing from its price, score group mask and optional market price"""
+        if reference:
+            base = self.relative_scores[bisect_right(RELATIVE_BREAKPOINTS, price / reference)]
+        else:
+            base = self.base_scores[bisect_right(self.breakpoints, price)]
+        return min(base + self.bonus(mask), MAX_SCORE)
+
+    def score_batch(self, prices, masks, references=None):
+        """Score a batch of listings; returns a list of ints.
+
+        references holds each listing's market price, or None where the
+        model has no index yet.
+        """
+        if references is None:
+            references = [None] * len(prices)
+        if np is not None and self._np_mask_points is not None:
+            prices = np.asarray(prices, dtype=float)
+            references = np.asarray([reference or 0.0 for reference in references], dtype=float)
+            has_reference = references > 0
+            ratios = np.divide(prices, references, out=np.zeros_like(prices), where=has_reference)
+            absolute = self._np_base_scores[np.searchsorted(self._np_breakpoints, prices, side='right')]
+            relative = self._np_relative_scores[np.searchsorted(self._np_relative_breakpoints, ratios, side='right')]
+            scores = np.where(has_reference, relative, absolute) + self._np_mask_points[np.asarray(masks, dtype=np.int64)]
+            return np.minimum(scores, MAX_SCORE).tolist()
+        return [self.score(price, mask, reference) for price, mask, reference in zip(prices, masks, references)]
+
+
+def rescore_database(db_path, config, batch_size=50000):
+    """Rescore every stored listing and return a {score: count} histogram"""
+    from keyword_module import KeywordEngine
+
+    scorer = DealScorer.from_config(config)
+    keywords = KeywordEngine(score_groups=scorer.score_groups)
+    histogram = {}
+
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        cursor = conn.execute('SELECT title, price FROM listings')
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            masks = [keywords.group_mask(keywords.scan(title or '')) for title, _ in rows]
+            for score in scorer.score_batch([price or 0.0 for _, price in rows], masks):
+                histogram[score] = histogram.get(score, 0) + 1
+    finally:
+        conn.close()
+    return histogram
+
+
+# Rescore the listings table with the current deal_scoring settings
+if __name__ == "__main__":
+    from config_module import Config
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    db_path = sys.argv[1] if len(sys.argv) > 1 else 'sneaker_deals.db'
+
+    started = time.perf_counter()
+    histogram = rescore_database(db_path, Config())
+    elapsed = time.perf_counter() - started
+
+    total = sum(histogram.values())
+    print(f"\nRescored {total} listings in {elapsed:.2f}s ({'numpy' if np is not None else 'bisect'})")
+    for score in sorted(histogram, reverse=True):
+        print(f"  {score:>2}/10: {histogram[score]}")
@@ -1,19 +1,85 @@
 import asyncio
 import aiohttp
 import re
+import sys
 import logging
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-import random
 import time
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from scheduler_module import RequestScheduler
+from parser_module import get_parser, parse_price, parse_compact, StreamingListingParser
+from listing_module import Listing
+from planner_module import QueryPlanner
+from metrics_module import METRICS, SIZE_BUCKETS
+from capture_module import PageRecorder
+from logging_module import start_worker_log_listener, setup_worker_logging
 
 logger = logging.getLogger(__name__)
 
+FETCH_SECONDS = METRICS.histogram('sneaker_fetch_seconds', 'Search page download time, from request to last byte')
+TERM_SECONDS = METRICS.histogram('sneaker_term_seconds', 'Time to scrape all pages of one search query', labels=('term',))
+PAGE_BYTES = METRICS.histogram('sneaker_page_bytes', 'Size of downloaded search pages', buckets=SIZE_BUCKETS)
+DOWNLOADED_BYTES = METRICS.counter('sneaker_downloaded_bytes_total', 'Bytes of search result pages downloaded')
+PARSE_SECONDS = METRICS.histogram('sneaker_parse_seconds', 'Time spent parsing one search page')
+
+# Returned by fetch_page when a search page has not changed since the last fetch
+PAGE_UNCHANGED = object()
+
+# Item IDs and prices in page order; identical sequences mean identical results
+RESULTS_FINGERPRINT_RE = re.compile(r'/itm/(?:[^"?]*/)?(\d{6,})|s-item__price">([^<]*)<')
+
+
+class PageFetchError(Exception):
+    """A search page could not be downloaded"""
+
 
 class SneakerScraper:
-    def __init__(self):
+    # How many of a term's newest listing keys to remember as "stop here" markers
+    MARKER_COUNT = 10
+
+    # Bytes read from the response per step in streaming mode
+    STREAM_CHUNK_SIZE = 16384
+
+    def __init__(self, search_terms=None, check_interval_seconds=180, max_listings_per_search=20,
+                 items_per_page=50, max_pages=5, parser_backend='lxml', parse_workers=0,
+                 parse_executor='process', streaming=False, share_overlapping_terms=True, capture_dir=None,
+                 max_concurrent_requests=4, max_requests_per_second=1.0, max_connections=100,
+                 max_connections_per_host=8, dns_cache_ttl=300, keepalive_timeout=60, request_timeout=30):
         self.base_url = "https://www.ebay.com"
-        self.search_terms = ["Jordan 1", "Nike Dunk"]
+        self.search_terms = list(search_terms) if search_terms else ["Jordan 1", "Nike Dunk"]
+        self.check_interval_seconds = check_interval_seconds
+        self.max_listings_per_search = max_listings_per_search
+        self.items_per_page = items_per_page
+        self.max_pages = max_pages
+        self.parser = get_parser(parser_backend)
+        self.streaming = streaming
+        if streaming and self.parser.name != 'lxml':
+            logger.warning("Streaming mode needs the lxml parser, downloading pages in full instead")
+            self.streaming = False
+
+        # Optional executor so parsing many pages does not stall the event loop
+        self.parse_workers = parse_workers
+        self.parse_executor_kind = parse_executor
+        self.parse_executor = None
+        self._worker_log_listener = None
+
+        # Newest listing keys seen per query, newest first; pagination stops when it reaches one
+        self.term_markers = {}
+        # Queries whose last poll stopped before reaching a marker; their pages are never skipped
+        self.incomplete_terms = set()
+
+        # Overlapping terms are fetched once under the broadest of them
+        self.share_overlapping_terms = share_overlapping_terms
+        self.planner = QueryPlanner(self.search_terms)
+
+        # Per-URL cache validators and result fingerprints for skipping unchanged pages
+        self.validators = {}
+        self.fingerprints = {}
+        self.page_stats = self._empty_page_stats()
+
+        # Saves every downloaded page for the replay benchmark when set
+        self.recorder = PageRecorder(capture_dir) if capture_dir else None
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -23,8 +89,125 @@ class SneakerScraper:
             'Upgrade-Insecure-Requests': '1'
         }
 
-    def build_search_url(self, search_term, limit=20):
-        """Build eBay search URL"""
+        # Connection pool settings for the long-lived session
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self.session = None
+        self.connection_stats = self._empty_connection_stats()
+
+        # Spreads requests for all terms across the check interval
+        self.scheduler = RequestScheduler(max_concurrent_requests, max_requests_per_second)
+        self.term_latencies = {}
+
+    @staticmethod
+    def _empty_connection_stats():
+        return {
+            'new_connections': 0,
+            'reused_connections': 0,
+            'connect_seconds': 0.0,
+            'dns_cache_hits': 0,
+            'dns_cache_misses': 0,
+        }
+
+    @staticmethod
+    def _empty_page_stats():
+        return {
+            'fetched': 0,
+            'not_modified': 0,
+            'unchanged_fingerprint': 0,
+        }
+
+    def _fingerprint(self, html_content):
+        """Hash the item IDs and prices of a results page, ignoring everything else"""
+        digest = hashlib.blake2b(digest_size=16)
+        for item_id, price in RESULTS_FINGERPRINT_RE.findall(html_content):
+            digest.update(f"{item_id}|{price};".encode('utf-8'))
+        return digest.digest()
+
+    def _build_trace_config(self):
+        """Trace connection setup so per-cycle handshake cost is visible"""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_connection_create_start(session, ctx, params):
+            ctx.connect_started = time.perf_counter()
+
+        async def on_connection_create_end(session, ctx, params):
+            self.connection_stats['new_connections'] += 1
+            self.connection_stats['connect_seconds'] += time.perf_counter() - ctx.connect_started
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self.connection_stats['reused_connections'] += 1
+
+        async def on_dns_cache_hit(session, ctx, params):
+            self.connection_stats['dns_cache_hits'] += 1
+
+        async def on_dns_cache_miss(session, ctx, params):
+            self.connection_stats['dns_cache_misses'] += 1
+
+        trace_config.on_connection_create_start.append(on_connection_create_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace_config.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace_config.on_dns_cache_miss.append(on_dns_cache_miss)
+        return trace_config
+
+    async def start(self):
+        """Open the shared HTTP session used for every scrape cycle"""
+        if self.session is not None and not self.session.closed:
+            return self.session
+
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.max_connections_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+            trace_configs=[self._build_trace_config()]
+        )
+        logger.info("Scraper HTTP session started")
+
+        if self.parse_workers > 0 and self.parse_executor is None:
+            if self.parse_executor_kind == 'thread':
+                # Only useful with a parser that releases the GIL, such as lxml
+                self.parse_executor = ThreadPoolExecutor(self.parse_workers, thread_name_prefix='parser')
+            else:
+                # Forking now would copy the logging, store and loop threads' locks
+                # into the workers, so they start from a clean interpreter instead
+                start_methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in start_methods else 'spawn')
+                log_queue, self._worker_log_listener = start_worker_log_listener(context)
+                self.parse_executor = ProcessPoolExecutor(
+                    self.parse_workers,
+                    mp_context=context,
+                    initializer=setup_worker_logging,
+                    initargs=(log_queue, logging.getLogger().getEffectiveLevel())
+                )
+            logger.info(f"Parsing on {self.parse_workers} {self.parse_executor_kind} workers")
+        return self.session
+
+    async def close(self):
+        """Close the shared HTTP session and its pooled connections"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+            logger.info("Scraper HTTP session closed")
+        self.session = None
+
+        if self.parse_executor is not None:
+            self.parse_executor.shutdown(wait=True)
+            self.parse_executor = None
+        if self._worker_log_listener is not None:
+            self._worker_log_listener.stop()
+            self._worker_log_listener = None
+
+    def build_search_url(self, search_term, limit=50, page=1):
+        """Build eBay search URL for one page of newest-first results"""
         # Replace spaces with +
         encoded_term = search_term.replace(' ', '+')
 
@@ -32,240 +215,339 @@ class SneakerScraper:
         url = f"{self.base_url}/sch/i.html?_from=R40&_nkw={encoded_term}"
         url += "&_sacat=15709"  # Men's Shoes category
         url += "&_sop=10"  # Sort by newly listed
-        url += "&_ipg=50"  # Items per page
+        url += f"&_ipg={limit}"  # Items per page
+        if page > 1:
+            url += f"&_pgn={page}"  # Page number
         url += "&LH_Auction=1"  # Include auctions
         url += "&LH_BIN=1"  # Include Buy It Now
         url += "&_dcat=15709"  # Sneakers category
 
         return url
 
-    async def fetch_page(self, session, url):
-        """Fetch page content with error handling"""
+    def _conditional_headers(self, url):
+        """Validators from the previous response for url"""
+        headers = {}
+        etag, last_modified = self.validators.get(url, (None, None))
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    async def fetch_page(self, session, url, skip_unchanged=True):
+        """Fetch page content with error handling.
+
+        Sends the validators from the previous response so the server can
+        answer 304, and falls back to comparing a fingerprint of the results.
+        Returns PAGE_UNCHANGED in either case so the caller can skip parsing,
+        unless skip_unchanged is False.
+        """
+        headers = self._conditional_headers(url) if skip_unchanged else {}
         try:
-            # Add random delay to avoid being blocked
-            await asyncio.sleep(random.uniform(1, 3))
-
-            async with session.get(url, headers=self.headers) as response:
-                if response.status == 200:
-                    return await response.text()
-                else:
-                    logger.warning(f"HTTP {response.status} for URL: {url}")
-                    return None
+            # Wait for a request slot so we never flood eBay
+            async with self.scheduler.slot(url):
+                started = time.perf_counter()
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 304:
+                        self.page_stats['not_modified'] += 1
+                        return PAGE_UNCHANGED
+                    elif response.status == 200:
+                        # text() decodes the body read() already buffered
+                        body = await response.read()
+                        html_content = await response.text()
+                        FETCH_SECONDS.observe(time.perf_counter() - started)
+                        PAGE_BYTES.observe(len(body))
+                        DOWNLOADED_BYTES.inc(len(body))
+                        if self.recorder is not None:
+                            self.recorder.save(url, body)
+                        self.page_stats['fetched'] += 1
+                        self.validators[url] = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                    else:
+                        logger.warning(f"HTTP {response.status} for URL: {url}")
+                        return None
         except Exception as e:
             logger.error(f"Error fetching {url}: {e}")
             return None
 
+        fingerprint = self._fingerprint(html_content)
+        if skip_unchanged and self.fingerprints.get(url) == fingerprint:
+            self.page_stats['unchanged_fingerprint'] += 1
+            return PAGE_UNCHANGED
+        self.fingerprints[url] = fingerprint
+        return html_content
+
     def parse_price(self, price_text):
         """Extract price from text"""
-        if not price_text:
-            return 0.0
-
-        # Remove currency symbols and extract number
-        # Adjusted regex to handle cases like "$1,234.56" and "$12.00 to $20.00"
-        price_match = re.search(r'(\d[\d.,]*)', price_text)
-        if price_match:
-            price_str = price_match.group(1).replace(',', '')
-            try:
-                return float(price_str)
-            except ValueError:
-                return 0.0
-        return 0.0
+        return parse_price(price_text)
 
     def parse_listings(self, html_content):
-        """Parse eBay search results and extract upper material and condition"""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        listings = []
-
-        # Main container for each listing is now <li> with class 's-item'
-        items = soup.find_all('li', class_='s-item')
-
-        for item in items:
-            try:
-                # Skip sponsored items and ads
-                # The 'SPONSORED' span is often inside the s-item__info div now
-                if item.find('span', class_='s-item__hl-tag') and "SPONSORED" in item.find('span',
-                                                                                           class_='s-item__hl-tag').get_text(
-                        strip=True).upper():
-                    continue
-
-                # Check for "Shop on eBay" and similar titles from the primary link
-                link_elem = item.find('a', class_='s-item__link')
-                if not link_elem:
-                    continue
-
-                # Extract title from within the 's-item__title' div inside the link
-                title_div_elem = link_elem.find('div', class_='s-item__title')
-                if not title_div_elem:
-                    continue
-
-                # The actual title text is within a span with role="heading"
-                title_span_elem = title_div_elem.find('span', {'role': 'heading', 'aria-level': '3'})
-                if not title_span_elem:
-                    continue
-
-                title = title_span_elem.get_text(strip=True)
-
-                if title.lower() in ['shop on ebay', 'new listing', 'newly listed', 'sponsored']:
-                    continue
-
-                url = link_elem.get('href')
-                if not url:
-                    continue
-
-                # Clean URL (remove tracking parameters)
-                url = url.split('?')[0] if '?' in url else url
-
-                # Extract price from span with class 's-item__price'
-                price_elem = item.find('span', class_='s-item__price')
-                if not price_elem:
-                    # Fallback for alternative price display if primary fails (e.g., "See price")
-                    price_elem = item.find('span', class_='s-price-range')  # For price ranges
-                    if not price_elem:
-                        # Another common location for price
-                        price_elem = item.find('div', class_='s-item__price')  # Sometimes it's a div
-                        if not price_elem:
-                            continue  # No price found, skip listing
-
-                price_text = price_elem.get_text(strip=True)
-                price = self.parse_price(price_text)
-
-                if price <= 0:
-                    continue
-
-                # Extract condition from span with class 'SECONDARY_INFO' within 's-item__subtitle'
-                condition_elem = item.find('div', class_='s-item__subtitle').find('span',
-                                                                                  class_='SECONDARY_INFO') if item.find(
-                    'div', class_='s-item__subtitle') else None
-                condition = condition_elem.get_text(strip=True) if condition_elem else 'Unknown'
-
-                # Extract image URL
-                # The img tag is usually inside 's-item__image-wrapper' or directly within 's-item__image'
-                img_elem = item.find('div', class_='s-item__image-wrapper').find('img') if item.find('div',
-                                                                                                     class_='s-item__image-wrapper') else None
-                if not img_elem:
-                    img_elem = item.find('div', class_='s-item__image').find('img')  # Fallback
-
-                image_url = img_elem.get('src') if img_elem else None
-
-                # Clean image URL
-                if image_url and image_url.startswith('//'):
-                    image_url = 'https:' + image_url
-
-                # Infer Upper Material from title (as before, direct extraction requires product page visit)
-                upper_material = 'Unknown'
-                title_lower = title.lower()
-                if 'patent leather' in title_lower:
-                    upper_material = 'Patent Leather'
-                elif 'synthetic' in title_lower:
-                    upper_material = 'Synthetic'
-                elif 'mesh' in title_lower:
-                    upper_material = 'Mesh'
-                elif 'nubuck' in title_lower:
-                    upper_material = 'Nubuck'
-                elif 'fabric' in title_lower:
-                    upper_material = 'Fabric'
-                elif 'faux leather' in title_lower:
-                    upper_material = 'Faux Leather'
-                elif 'leather' in title_lower:
-                    upper_material = 'Leather'
-
-                listing = {
-                    'title': title,
-                    'price': price,
-                    'condition': condition,
-                    'upper_material': upper_material,
-                    'url': url,
-                    'image_url': image_url
-                }
-
-                listings.append(listing)
-
-            except Exception as e:
-                # Log the error and the problematic HTML snippet for better debugging
-                logger.warning(f"Error parsing listing: {e}")
-                # You might want to uncomment the line below for deeper debugging
-                # logger.warning(f"Problematic item HTML: {item}")
-                continue
-
-        return listings
+        """Parse eBay search results with the configured parser backend"""
+        return self.parser.parse(html_content)
+
+    async def parse_listings_async(self, html_content):
+        """Parse on the worker pool when one is configured, otherwise inline"""
+        if self.parse_executor is None:
+            with PARSE_SECONDS.time():
+                return self.parse_listings(html_content)
+
+        # Only raw HTML goes out and compact tuples come back, to keep pickling cheap
+        loop = asyncio.get_running_loop()
+        with PARSE_SECONDS.time():
+            rows = await loop.run_in_executor(self.parse_executor, parse_compact, self.parser.name, html_content)
+            return [Listing.from_tuple(row) for row in rows]
+
+    async def stream_listings(self, session, url, skip_unchanged=True):
+        """Yield a page's listings as each one finishes downloading.
+
+        Yields nothing when the server answers 304 and raises PageFetchError
+        when the page cannot be downloaded. Without skip_unchanged no
+        validators are sent, so the page always comes back in full.
+        """
+        headers = self._conditional_headers(url) if skip_unchanged else {}
+        try:
+            async with self.scheduler.slot(url):
+                started = time.perf_counter()
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 304:
+                        self.page_stats['not_modified'] += 1
+                        return
+                    if response.status != 200:
+                        logger.warning(f"HTTP {response.status} for URL: {url}")
+                        raise PageFetchError(url)
+
+                    self.page_stats['fetched'] += 1
+                    self.validators[url] = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                    parser = StreamingListingParser(response.charset)
+                    size = 0
+                    parse_seconds = 0.0
+                    chunks = [] if self.recorder is not None else None
+                    async for chunk in response.content.iter_chunked(self.STREAM_CHUNK_SIZE):
+                        size += len(chunk)
+                        if chunks is not None:
+                            chunks.append(chunk)
+                        DOWNLOADED_BYTES.inc(len(chunk))
+                        parse_started = time.perf_counter()
+                        parsed = parser.feed(chunk)
+                        parse_seconds += time.perf_counter() - parse_started
+                        for listing in parsed:
+                            yield listing
+                    parse_started = time.perf_counter()
+                    parsed = parser.close()
+                    parse_seconds += time.perf_counter() - parse_started
+                    # Only pages read to the end are comparable, early stops are not recorded
+                    FETCH_SECONDS.observe(time.perf_counter() - started)
+                    PAGE_BYTES.observe(size)
+                    PARSE_SECONDS.observe(parse_seconds)
+                    if chunks is not None:
+                        self.recorder.save(url, b''.join(chunks))
+                    for listing in parsed:
+                        yield listing
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Error fetching {url}: {e}")
+            raise PageFetchError(url) from e
+
+    async def iter_page_listings(self, session, url, skip_unchanged=True):
+        """Yield a page's listings, streamed or parsed in one go depending on the mode"""
+        if self.streaming:
+            async for listing in self.stream_listings(session, url, skip_unchanged):
+                yield listing
+            return
+
+        html_content = await self.fetch_page(session, url, skip_unchanged)
+        if html_content is PAGE_UNCHANGED:
+            # Same results as last time, so nothing on this page is new
+            return
+        if not html_content:
+            raise PageFetchError(url)
+        for listing in await self.parse_listings_async(html_content):
+            yield listing
 
     async def scrape_search_term(self, session, search_term, limit=20):
-        """Scrape listings for a specific search term"""
-        url = self.build_search_url(search_term, limit)
+        """Scrape listings for a specific search term.
+
+        Results are newest first, so pages are followed only until a listing
+        seen on the previous poll shows up. A term with no history only gets its
+        first page, capped at limit listings. Unchanged pages are only skipped
+        when the previous poll reached its markers; otherwise an unchanged
+        first page would hide the pages that failed last time.
+        """
+        old_markers = self.term_markers.get(search_term, [])
+        markers = set(old_markers)
+        skip_unchanged = search_term not in self.incomplete_terms
         logger.info(f"Scraping: {search_term}")
 
-        html_content = await self.fetch_page(session, url)
-        if not html_content:
-            return []
-
-        listings = self.parse_listings(html_content)
+        started = time.perf_counter()
+        listings = []
+        newest_keys = []
+        complete = False
+        for page in range(1, self.max_pages + 1):
+            url = self.build_search_url(search_term, self.items_per_page, page)
+            page_count = 0
+            reached_marker = False
+            page_listings = self.iter_page_listings(session, url, skip_unchanged)
+            try:
+                # Stop reading as soon as a listing from the last poll shows up
+                async for listing in page_listings:
+                    page_count += 1
+                    if page == 1 and page_count <= self.MARKER_COUNT:
+                        newest_keys.append(listing.key)
+                    if listing.key in markers:
+                        reached_marker = True
+                        break
+                    listings.append(listing)
+                    if not markers and len(listings) >= limit:
+                        break
+            except PageFetchError:
+                break
+            finally:
+                await page_listings.aclose()
 
-        # Filter for relevant listings and limit results
+            if reached_marker or not markers or not page_count:
+                complete = True
+                break
+        else:
+            logger.warning(f"Stopped '{search_term}' after {self.max_pages} pages without reaching a seen listing")
+            complete = True
+        self.term_latencies[search_term] = time.perf_counter() - started
+        TERM_SECONDS.labels(search_term).observe(self.term_latencies[search_term])
+
+        # Only move the markers once the gap since the last poll is covered,
+        # otherwise a failed page fetch would skip listings for good. Older
+        # markers are kept behind the new ones: a quiet poll collects only
+        # the listings above the first known one, and if those are sold the
+        # next poll still needs something to stop at
+        if complete and newest_keys:
+            self.term_markers[search_term] = (
+                newest_keys + [key for key in old_markers if key not in newest_keys]
+            )[:self.MARKER_COUNT]
+        if complete:
+            self.incomplete_terms.discard(search_term)
+        else:
+            self.incomplete_terms.add(search_term)
+
+        if not markers:
+            listings = listings[:limit]
+
+        # Filter for relevant listings
         filtered_listings = []
         for listing in listings:
-            title_lower = listing['title'].lower()
-
             # Basic relevance check
-            if any(term.lower() in title_lower for term in ['jordan', 'nike', 'dunk', 'air']):
+            if any(term in listing.title_lower for term in ['jordan', 'nike', 'dunk', 'air']):
+                listing.search_term = search_term
                 filtered_listings.append(listing)
 
-            if len(filtered_listings) >= limit:
-                break
-
-        logger.info(f"Found {len(filtered_listings)} relevant listings for '{search_term}'")
+        logger.info(f"Found {len(filtered_listings)} relevant listings for '{search_term}' ({page} pages)")
         return filtered_listings
 
-    async def scrape_listings(self):
-        """Main scraping function"""
+    async def _scrape_query(self, session, query):
+        """Return (query, listings) so results can be matched up as they complete"""
+        try:
+            return query, await self.scrape_search_term(session, query, self.max_listings_per_search)
+        except Exception as e:
+            logger.error(f"Scraping task failed: {e}")
+            return query, []
+
+    async def scrape_batches(self, search_terms=None, interval_seconds=None):
+        """Yield each query's new listings as soon as that query finishes.
+
+        Scrapes search_terms or every configured term. Terms covered by a
+        broader requested or configured term are not fetched themselves; the
+        broader query's listings are routed to them. A listing found by
+        several queries is only yielded with the first.
+        """
+        search_terms = self.search_terms if search_terms is None else search_terms
+        interval_seconds = interval_seconds or self.check_interval_seconds
+        if self.share_overlapping_terms:
+            plan = self.planner.plan(search_terms)
+        else:
+            plan = {search_term: [search_term] for search_term in search_terms}
+
+        session = await self.start()
+        self.connection_stats = self._empty_connection_stats()
+        self.page_stats = self._empty_page_stats()
+        self.term_latencies = {}
+        if self.recorder is not None:
+            self.recorder.start_cycle()
+        # Budget for every term paging to max_pages so follow-up pages never spill past the interval
+        self.scheduler.plan_cycle(len(plan) * self.max_pages, interval_seconds)
+
+        # Scrape all planned queries; the scheduler decides when each request goes out
+        tasks = [asyncio.ensure_future(self._scrape_query(session, query)) for query in plan]
+        seen_keys = set()
+        try:
+            # Hand each query downstream as it completes instead of waiting for the slowest
+            for next_result in asyncio.as_completed(tasks):
+                query, result = await next_result
+                terms = plan[query]
+                batch = []
+                for listing in result:
+                    if terms != [query]:
+                        # Shared results go to the narrowest matching term
+                        listing.search_term = self.planner.route(listing, query, terms)
+                        if listing.search_term is None:
+                            continue
+                    # Remove duplicates by item ID, including items found under several terms
+                    if listing.key not in seen_keys:
+                        seen_keys.add(listing.key)
+                        batch.append(listing)
+                yield batch
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if len(plan) < len(search_terms):
+            logger.info(f"Fetched {len(plan)} queries for {len(search_terms)} terms")
+
+        stats = self.connection_stats
+        logger.info(
+            f"Connection setup: {stats['new_connections']} new ({stats['connect_seconds'] * 1000:.0f} ms), "
+            f"{stats['reused_connections']} reused, {stats['dns_cache_hits']} DNS cache hits"
+        )
+        pages = self.page_stats
+        logger.info(
+            f"Pages: {pages['fetched']} downloaded, skipped parsing {pages['not_modified']} not modified "
+            f"and {pages['unchanged_fingerprint']} unchanged"
+        )
+        if self.term_latencies:
+            slowest = max(self.term_latencies, key=self.term_latencies.get)
+            logger.info(
+                f"Scheduler: {self.scheduler.rate:.2f} req/s, max queue depth {self.scheduler.max_queue_depth}, "
+                f"slowest term '{slowest}' {self.term_latencies[slowest]:.1f}s"
+            )
+        logger.info(f"Scraped {len(seen_keys)} unique listings total")
+
+    async def scrape_listings(self, search_terms=None, interval_seconds=None):
+        """Scrape search_terms or every configured term and return all unique listings at once"""
         all_listings = []
-
-        async with aiohttp.ClientSession() as session:
-            # Scrape all search terms
-            tasks = []
-            for search_term in self.search_terms:
-                tasks.append(self.scrape_search_term(session, search_term))
-
-            # Wait for all scraping tasks to complete
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-
-            # Collect all listings
-            for result in results:
-                if isinstance(result, Exception):
-                    logger.error(f"Scraping task failed: {result}")
-                elif isinstance(result, list):
-                    all_listings.extend(result)
-
-        # Remove duplicates based on URL
-        seen_urls = set()
-        unique_listings = []
-
-        for listing in all_listings:
-            if listing['url'] not in seen_urls:
-                seen_urls.add(listing['url'])
-                unique_listings.append(listing)
-
-        logger.info(f"Scraped {len(unique_listings)} unique listings total")
-        return unique_listings
+        async for batch in self.scrape_batches(search_terms, interval_seconds):
+            all_listings.extend(batch)
+        return all_listings
 
 
 # Test function
-async def test_scraper():
-    """Test the scraper"""
+async def test_scraper(capture_dir=None):
+    """Test the scraper, saving the downloaded pages to capture_dir if given"""
     # Configure logging
     logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-    scraper = SneakerScraper()
-    listings = await scraper.scrape_listings()
+    scraper = SneakerScraper(capture_dir=capture_dir)
+    try:
+        listings = await scraper.scrape_listings()
+    finally:
+        await scraper.close()
+    if scraper.recorder is not None:
+        print(f"Captured {scraper.recorder.pages_saved} pages to {capture_dir}")
 
     print(f"\n--- Found {len(listings)} listings: ---")
     for i, listing in enumerate(listings[:10]):  # Show first 10
-        print(f"\n{i + 1}. Title: {listing['title']}")
-        print(f"   Price: ${listing['price']:.2f}")
-        print(f"   Condition: {listing['condition']}")
-        print(f"   Upper Material: {listing['upper_material']}")
-        print(f"   URL: {listing['url']}")
-        print(f"   Image URL: {listing['image_url']}")
+        print(f"\n{i + 1}. Title: {listing.title}")
+        print(f"   Price: ${listing.price:.2f}")
+        print(f"   Condition: {listing.condition}")
+        print(f"   Upper Material: {listing.upper_material}")
+        print(f"   URL: {listing.url}")
+        print(f"   Image URL: {listing.image_url}")
 
 
 if __name__ == "__main__":
-    asyncio.run(test_scraper())
+    # python scraper_module.py [capture_dir]
+    asyncio.run(test_scraper(sys.argv[1] if len(sys.argv) > 1 else None))
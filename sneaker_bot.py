@@ -1,173 +1,257 @@
 import discord
 from discord.ext import tasks
 import asyncio
-import json
-import sqlite3
 import logging
-from datetime import datetime, timedelta
-import re
+import signal
+import time
 from scraper_module import SneakerScraper
 from config_module import Config
+from storage_module import ListingStore
+from posting_module import DealPoster, DeferredEmbed, MAX_EMBEDS_PER_MESSAGE
+from scheduler_module import AdaptivePollSchedule
+from keyword_module import KeywordEngine
+from scoring_module import DealScorer
+from price_index_module import PriceIndex
+from subscription_module import Subscription, SubscriptionIndex
+from metrics_module import METRICS, MetricsServer, Profiler
+from capture_module import PageRecorder
+from embed_module import EmbedRenderer
+from history_module import ListingHistory
+from logging_module import setup_logging
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('bot.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
+CYCLE_SECONDS = METRICS.histogram('sneaker_cycle_seconds', 'Duration of a whole monitoring cycle')
+DEDUP_SECONDS = METRICS.histogram('sneaker_dedup_seconds', 'Time to check a cycle\'s listings against the seen store')
+FILTER_SECONDS = METRICS.histogram('sneaker_filter_seconds', 'Time to filter and score a cycle\'s new listings')
+RECORD_SECONDS = METRICS.histogram('sneaker_record_seconds', 'Time to store a cycle\'s new listings')
+LISTINGS_SCRAPED = METRICS.counter('sneaker_listings_scraped_total', 'Listings returned by the scraper')
+DEALS_QUEUED = METRICS.counter('sneaker_deals_queued_total', 'New deals handed to the posting queues')
+
 class SneakerBot(discord.Client):
-    def __init__(self):
+    # How often config.json is checked for edits
+    CONFIG_POLL_SECONDS = 5
+
+    # Settings that only take effect on restart: (section, attribute)
+    RESTART_SETTINGS = [
+        ('discord', 'DISCORD_TOKEN'),
+        ('scraping', 'PARSER'),
+        ('scraping', 'PARSE_WORKERS'),
+        ('scraping', 'PARSE_EXECUTOR'),
+        ('scraping', 'STREAMING'),
+        ('posting', 'MAX_POST_QUEUE_SIZE'),
+        ('price_index', 'PRICE_INDEX_ENABLED'),
+        ('history', 'HISTORY_ENABLED'),
+        ('history', 'HISTORY_DIR'),
+        ('metrics', 'METRICS_ENABLED'),
+        ('metrics', 'METRICS_HOST'),
+        ('metrics', 'METRICS_PORT'),
+        ('metrics', 'PROFILE_DIR'),
+    ]
+
+    def __init__(self, config=None):
         intents = discord.Intents.default()
         intents.message_content = True
         super().__init__(intents=intents)
         
-        self.config = Config()
-        self.scraper = SneakerScraper()
-        self.db_path = 'sneaker_deals.db'
-        self.init_database()
-        
-    def init_database(self):
-        """Initialize SQLite database for deduplication"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS listings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                url TEXT UNIQUE,
-                title TEXT,
-                price REAL,
-                posted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        conn.commit()
-        conn.close()
-        logger.info("Database initialized")
-    
-    def is_duplicate(self, url):
-        """Check if listing already exists in database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM listings WHERE url = ?', (url,))
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count > 0
-    
-    def save_listing(self, listing):
-        """Save new listing to database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self.config = config or Config()
+        self.applied_hashes = dict(self.config.section_hashes)
+        self.restart_values = {attribute: getattr(self.config, attribute) for _, attribute in self.RESTART_SETTINGS}
+        self.scraper = SneakerScraper(
+            search_terms=self.config.SEARCH_TERMS,
+            check_interval_seconds=self.config.CHECK_INTERVAL * 60,
+            max_listings_per_search=self.config.MAX_LISTINGS_PER_SEARCH,
+            items_per_page=self.config.ITEMS_PER_PAGE,
+            max_pages=self.config.MAX_PAGES,
+            parser_backend=self.config.PARSER,
+            parse_workers=self.config.PARSE_WORKERS,
+            parse_executor=self.config.PARSE_EXECUTOR,
+            streaming=self.config.STREAMING,
+            share_overlapping_terms=self.config.SHARE_OVERLAPPING_TERMS,
+            capture_dir=self.config.CAPTURE_DIR or None,
+            max_concurrent_requests=self.config.MAX_CONCURRENT_REQUESTS,
+            max_requests_per_second=self.config.MAX_REQUESTS_PER_SECOND
+        )
+        self.scorer = DealScorer.from_config(self.config)
+        self.subscriptions = SubscriptionIndex(Subscription.from_dict(data) for data in self.config.SUBSCRIPTIONS)
+        self.keywords = KeywordEngine(self.scorer.score_groups, self.subscriptions.keyword_tags())
+        self.price_index = PriceIndex(
+            window_days=self.config.PRICE_INDEX_WINDOW_DAYS,
+            min_samples=self.config.PRICE_INDEX_MIN_SAMPLES
+        ) if self.config.PRICE_INDEX_ENABLED else None
+        self.store = ListingStore('sneaker_deals.db', price_index=self.price_index)
+        self.history = ListingHistory(
+            self.config.HISTORY_DIR,
+            normalizer=self.price_index.normalizer if self.price_index is not None else None
+        ) if self.config.HISTORY_ENABLED else None
+        self.compaction_task = None
+        self.embeds = EmbedRenderer()
+        self.poll_schedule = AdaptivePollSchedule(
+            self.config.SEARCH_TERMS,
+            base_interval=self.config.CHECK_INTERVAL * 60,
+            min_interval=self.config.MIN_INTERVAL * 60,
+            max_interval=self.config.MAX_INTERVAL * 60
+        )
+        # One poster per channel so a rate-limited channel never holds up the others
+        self.posters = {subscription.channel_id: self.create_poster() for subscription in self.subscriptions.subscriptions}
+
+        self.profiler = Profiler(self.config.PROFILE_DIR)
+        self.metrics_server = MetricsServer(
+            METRICS, self.config.METRICS_HOST, self.config.METRICS_PORT, self.profiler
+        ) if self.config.METRICS_ENABLED else None
+        METRICS.gauge('sneaker_post_queue_depth', 'Deals waiting to be posted across all channels',
+                      lambda: sum(poster.depth for poster in self.posters.values()))
+        METRICS.gauge('sneaker_request_queue_depth', 'Page requests waiting for a scheduler slot',
+                      lambda: self.scraper.scheduler.waiting)
+        METRICS.gauge('sneaker_seen_cache_hit_rate', 'Share of dedup lookups answered without SQLite',
+                      lambda: self.store.cache_stats()['hit_rate'])
+
+    def create_poster(self):
+        """Build a posting queue for one channel from the posting settings"""
+        return DealPoster(
+            max_embeds_per_message=self.config.MAX_EMBEDS_PER_MESSAGE,
+            min_send_interval=self.config.MIN_SEND_INTERVAL,
+            max_queue_size=self.config.MAX_POST_QUEUE_SIZE
+        )
+
+    async def setup_hook(self):
+        """Open long-lived resources before connecting to the gateway"""
+        await self.store.open()
+        self.poll_schedule.restore(await self.store.load_term_schedule())
+        self.scraper.term_markers.update(await self.store.load_term_markers())
+        await self.scraper.start()
+        for poster in self.posters.values():
+            poster.start()
+        if self.metrics_server is not None:
+            await self.metrics_server.start()
         try:
-            cursor.execute('''
-                INSERT INTO listings (url, title, price)
-                VALUES (?, ?, ?)
-            ''', (listing['url'], listing['title'], listing['price']))
-            conn.commit()
-            logger.info(f"Saved listing: {listing['title']}")
-        except sqlite3.IntegrityError:
-            logger.warning(f"Duplicate listing ignored: {listing['title']}")
-        finally:
-            conn.close()
-    
-    def cleanup_old_listings(self, days=7):
+            # kill -USR1 <pid> starts or stops a profile without the HTTP endpoint
+            asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, self.profiler.toggle)
+        except (NotImplementedError, AttributeError):
+            pass
+
+        # Tick at the fastest per-term interval; each tick only polls due terms
+        self.monitor_listings.change_interval(seconds=self.poll_schedule.min_interval)
+        self.watch_config.start()
+
+    async def close(self):
+        """Release long-lived resources on shutdown"""
+        self.watch_config.cancel()
+        await asyncio.gather(*(poster.stop() for poster in self.posters.values()))
+        if self.metrics_server is not None:
+            await self.metrics_server.stop()
+        elif self.profiler.running:
+            self.profiler.stop()
+        await super().close()
+        await self.scraper.close()
+        await self.store.close()
+        if self.history is not None:
+            if self.compaction_task is not None:
+                await self.compaction_task
+            await self.history.close()
+
+    async def cleanup_old_listings(self, days=7):
         """Remove old listings from database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cutoff_date = datetime.now() - timedelta(days=days)
-        cursor.execute('DELETE FROM listings WHERE posted_at < ?', (cutoff_date,))
-        deleted = cursor.rowcount
-        conn.commit()
-        conn.close()
-        if deleted > 0:
-            logger.info(f"Cleaned up {deleted} old listings")
-    
-    def calculate_deal_score(self, price, title):
-        """Calculate deal score based on price and keywords"""
-        score = 0
+        await self.store.cleanup(days)
+
+        stats = self.store.cache_stats()
+        logger.info(
+            f"Seen cache: {stats['hit_rate']:.1%} hit rate over {stats['lookups']} lookups, "
+            f"{stats['db_lookups']} reached the database, {stats['memory_bytes'] / 1024:.0f} KiB"
+        )
+        if self.price_index is not None:
+            stats = self.price_index.stats()
+            logger.info(f"Price index: {stats['ready_models']}/{stats['models']} models scored relatively, {stats['buckets']} buckets")
+        if self.history is not None and (self.compaction_task is None or self.compaction_task.done()):
+            # Rewriting a day as Parquet can take a while, so it runs beside the scrape cycles
+            self.compaction_task = asyncio.create_task(self.compact_history())
+
+    async def compact_history(self):
+        """Compact finished history days and log the history's size"""
+        try:
+            await self.history.compact()
+            stats = self.history.stats()
+            logger.info(
+                f"Listing history: {stats['compacted_days']} compacted days, {stats['staged_days']} staged, "
+                f"{stats['bytes'] / 1048576:.1f} MiB"
+            )
+        except Exception as e:
+            logger.error(f"Error compacting listing history: {e}")
+
+    @tasks.loop(seconds=CONFIG_POLL_SECONDS)
+    async def watch_config(self):
+        """Apply config.json edits without restarting the bot"""
+        try:
+            self.config.check_for_changes()
+            hashes = self.config.section_hashes
+            changed = {section for section in set(hashes) | set(self.applied_hashes)
+                       if hashes.get(section) != self.applied_hashes.get(section)}
+            if changed:
+                self.applied_hashes = dict(hashes)
+                await self.apply_config_changes(changed)
+        except Exception as e:
+            logger.error(f"Error applying config changes: {e}")
+
+    async def apply_config_changes(self, changed):
+        """Rebuild only what depends on the changed config sections"""
+        config = self.config
         
-        # Base score on price ranges
-        if price < 60:
-            score = 10
-        elif price < 80:
-            score = 9
-        elif price < 100:
-            score = 8
-        elif price < 120:
-            score = 7
-        elif price < 140:
-            score = 6
-        elif price < 160:
-            score = 5
-        elif price < 180:
-            score = 4
-        elif price < 200:
-            score = 3
-        else:
-            score = 2
+        if 'deal_scoring' in changed:
+            self.scorer = DealScorer.from_config(config)
         
-        # Bonus points for popular models
-        title_lower = title.lower()
-        if any(keyword in title_lower for keyword in ['jordan 1', 'aj1', 'air jordan 1']):
-            score += 1
-        if any(keyword in title_lower for keyword in ['dunk low', 'dunk high', 'sb dunk']):
-            score += 1
-        if 'retro' in title_lower:
-            score += 1
-        if any(keyword in title_lower for keyword in ['off white', 'travis scott', 'fragment']):
-            score += 2
+        if changed & {'discord', 'filters', 'subscriptions'}:
+            self.subscriptions = SubscriptionIndex(Subscription.from_dict(data) for data in config.SUBSCRIPTIONS)
+            await self.sync_posters()
         
-        return min(score, 10)  # Cap at 10
-    
-    def filter_listing(self, listing):
-        """Apply filters to determine if listing should be posted"""
-        price = listing['price']
-        title = listing['title'].lower()
+        if changed & {'deal_scoring', 'discord', 'filters', 'subscriptions'}:
+            self.keywords = KeywordEngine(self.scorer.score_groups, self.subscriptions.keyword_tags())
         
-        # Price range filter
-        if price < self.config.MIN_PRICE or price > self.config.MAX_PRICE:
-            return False, "Price out of range"
+        if 'scraping' in changed:
+            scraper = self.scraper
+            scraper.search_terms = list(config.SEARCH_TERMS)
+            scraper.planner.set_terms(scraper.search_terms)
+            scraper.share_overlapping_terms = config.SHARE_OVERLAPPING_TERMS
+            if (scraper.recorder.capture_dir if scraper.recorder else '') != config.CAPTURE_DIR:
+                scraper.recorder = PageRecorder(config.CAPTURE_DIR) if config.CAPTURE_DIR else None
+            scraper.check_interval_seconds = config.CHECK_INTERVAL * 60
+            scraper.max_listings_per_search = config.MAX_LISTINGS_PER_SEARCH
+            scraper.items_per_page = config.ITEMS_PER_PAGE
+            scraper.max_pages = config.MAX_PAGES
+            scraper.scheduler.configure(config.MAX_CONCURRENT_REQUESTS, config.MAX_REQUESTS_PER_SECOND)
+            self.poll_schedule.configure(config.CHECK_INTERVAL * 60, config.MIN_INTERVAL * 60, config.MAX_INTERVAL * 60)
+            self.poll_schedule.set_terms(config.SEARCH_TERMS)
+            self.monitor_listings.change_interval(seconds=self.poll_schedule.min_interval)
         
-        # Include keywords filter
-        if self.config.INCLUDE_KEYWORDS:
-            if not any(keyword.lower() in title for keyword in self.config.INCLUDE_KEYWORDS):
-                return False, "No include keywords found"
+        if 'posting' in changed:
+            for poster in self.posters.values():
+                poster.max_embeds_per_message = max(1, min(config.MAX_EMBEDS_PER_MESSAGE, MAX_EMBEDS_PER_MESSAGE))
+                poster.min_send_interval = config.MIN_SEND_INTERVAL
         
-        # Exclude keywords filter
-        if self.config.EXCLUDE_KEYWORDS:
-            if any(keyword.lower() in title for keyword in self.config.EXCLUDE_KEYWORDS):
-                return False, "Exclude keyword found"
+        if 'price_index' in changed and self.price_index is not None:
+            self.price_index.window_days = config.PRICE_INDEX_WINDOW_DAYS
+            self.price_index.min_samples = config.PRICE_INDEX_MIN_SAMPLES
         
-        return True, "Passed all filters"
-    
-    def create_embed(self, listing):
-        """Create Discord embed for listing"""
-        should_post, reason = self.filter_listing(listing)
-        if not should_post:
+        for section, attribute in self.RESTART_SETTINGS:
+            if section in changed and getattr(config, attribute) != self.restart_values[attribute]:
+                logger.warning(f"{section}: {attribute} changed, restart the bot to apply it")
+
+    async def sync_posters(self):
+        """Start posters for new subscription channels and retire unused ones"""
+        channel_ids = {subscription.channel_id for subscription in self.subscriptions.subscriptions}
+        for channel_id in channel_ids - set(self.posters):
+            self.posters[channel_id] = self.create_poster()
+            self.posters[channel_id].start()
+        for channel_id in set(self.posters) - channel_ids:
+            # Let what is already queued go out in the background
+            asyncio.create_task(self.posters.pop(channel_id).stop())
+
+    def reference_price(self, listing):
+        """Market median for the listing's model, or None without enough history"""
+        if self.price_index is None:
             return None
-        
-        deal_score = self.calculate_deal_score(listing['price'], listing['title'])
-        
-        # Create embed
-        embed = discord.Embed(
-            title=f"🔥 {listing['title']}",
-            url=listing['url'],
-            color=0x00ff00 if deal_score >= 8 else 0xffa500 if deal_score >= 6 else 0xff0000
-        )
-        
-        embed.add_field(name="💰 Price", value=f"${listing['price']:.2f}", inline=True)
-        embed.add_field(name="📦 Condition", value=listing['condition'], inline=True)
-        embed.add_field(name="⭐ Deal Score", value=f"{deal_score}/10", inline=True)
-        
-        if listing['image_url']:
-            embed.set_thumbnail(url=listing['image_url'])
-        
-        embed.set_footer(text=f"Found on eBay • {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        
-        return embed
+        if listing.model is None:
+            listing.model = self.price_index.model_key(listing.title)
+        return self.price_index.reference_price(listing.model)
     
     async def on_ready(self):
         """Called when bot is ready"""
@@ -175,41 +259,106 @@ class SneakerBot(discord.Client):
         self.monitor_listings.start()
         logger.info("Started monitoring task")
     
-    @tasks.loop(minutes=3)  # Check every 3 minutes
+    async def process_listings(self, listings, channels):
+        """Dedup, filter, record and queue one batch of scraped listings; returns how many deals were queued"""
+        LISTINGS_SCRAPED.inc(len(listings))
+        with DEDUP_SECONDS.time():
+            seen_keys = await self.store.seen_many(listing.key for listing in listings)
+
+        # Match every new listing first, then score only the ones some channel wants
+        candidates = []
+        filter_started = time.perf_counter()
+        for listing in listings:
+            if listing.key in seen_keys:
+                continue
+            tags = self.keywords.scan(listing.title)
+            mask = self.subscriptions.match_mask(listing.price, tags)
+            if mask:
+                candidates.append((listing, tags, mask))
+        references = [self.reference_price(listing) for listing, _, _ in candidates]
+        scores = self.scorer.score_batch(
+            [listing.price for listing, _, _ in candidates],
+            [self.keywords.group_mask(tags) for _, tags, _ in candidates],
+            references
+        )
+
+        new_listings = []
+        deliveries = []
+        for (listing, _, mask), reference, deal_score in zip(candidates, references, scores):
+            subscriptions = self.subscriptions.subscriptions_for(mask, deal_score)
+            if subscriptions:  # Only if it passes some channel's filters
+                new_listings.append(listing)
+                embed = DeferredEmbed(self.embeds.render, listing, deal_score, reference, self.embeds.footer)
+                deliveries.append((listing, embed, subscriptions))
+        FILTER_SECONDS.observe(time.perf_counter() - filter_started)
+
+        with RECORD_SECONDS.time():
+            await self.store.record_many(new_listings)
+            # The market median needs every price, not just the ones that became deals
+            await self.store.record_prices(listing for listing in listings if listing.key not in seen_keys)
+        DEALS_QUEUED.inc(len(new_listings))
+        if self.history is not None:
+            # Every observation, seen before or not, so price history survives dedup cleanup
+            scores_by_key = {listing.key: score for (listing, _, _), score in zip(candidates, scores)}
+            await self.history.record_many(listings, scores_by_key)
+
+        # Hand off to the posting tasks so a slow channel never blocks scraping
+        for listing, embed, subscriptions in deliveries:
+            # Subscriptions may share a channel; each channel gets the deal once
+            for channel_id in dict.fromkeys(subscription.channel_id for subscription in subscriptions):
+                channel = channels.get(channel_id)
+                if channel:
+                    self.posters[channel_id].submit(channel, embed, f"{listing.title} - ${listing.price}")
+        return len(new_listings)
+
+    @tasks.loop(minutes=1)  # Re-timed to the min poll interval in setup_hook
     async def monitor_listings(self):
         """Main monitoring loop"""
         try:
-            logger.info("Starting scrape cycle...")
-            
-            # Get channel
-            channel = self.get_channel(self.config.DISCORD_CHANNEL_ID)
-            if not channel:
-                logger.error(f"Could not find channel with ID: {self.config.DISCORD_CHANNEL_ID}")
+            due_terms = self.poll_schedule.due_terms()
+            if not due_terms:
                 return
+
+            logger.info(f"Starting scrape cycle for {len(due_terms)} due terms...")
             
-            # Scrape listings
-            listings = await self.scraper.scrape_listings()
-            logger.info(f"Found {len(listings)} listings")
-            
-            new_listings = []
-            for listing in listings:
-                if not self.is_duplicate(listing['url']):
-                    embed = self.create_embed(listing)
-                    if embed:  # Only if it passes filters
-                        new_listings.append(listing)
-                        self.save_listing(listing)
-                        
-                        # Send to Discord
-                        await channel.send(embed=embed)
-                        logger.info(f"Posted new deal: {listing['title']} - ${listing['price']}")
-                        
-                        # Small delay to avoid rate limits
-                        await asyncio.sleep(1)
+            # Get channels
+            channels = {}
+            for channel_id in self.posters:
+                channel = self.get_channel(channel_id)
+                if channel:
+                    channels[channel_id] = channel
+                else:
+                    logger.error(f"Could not find channel with ID: {channel_id}")
+            if not channels:
+                return
             
-            if new_listings:
-                logger.info(f"Posted {len(new_listings)} new deals")
+            cycle_started = time.perf_counter()
+            # Embeds are only built by the posters, for deals that actually go out
+            self.embeds.start_cycle()
+            keys_per_term = {term: [] for term in due_terms}
+            scraped = queued = 0
+            # Each query's listings are filtered and posted while the others are still downloading
+            async for listings in self.scraper.scrape_batches(due_terms, self.poll_schedule.min_interval):
+                scraped += len(listings)
+                for listing in listings:
+                    if listing.search_term in keys_per_term:
+                        keys_per_term[listing.search_term].append(listing.key)
+                queued += await self.process_listings(listings, channels)
+            logger.info(f"Found {scraped} listings")
+
+            # Poll terms with fresh listings sooner and let quiet ones back off
+            for term, keys in keys_per_term.items():
+                self.poll_schedule.record_result(term, self.poll_schedule.count_new(term, keys))
+            await self.store.save_term_schedule(self.poll_schedule.snapshot(due_terms))
+            # Markers belong to the queries actually fetched, which may be broader than the due terms
+            await self.store.save_term_markers(self.scraper.term_markers)
+
+            if queued:
+                waiting = sum(poster.depth for poster in self.posters.values())
+                logger.info(f"Queued {queued} new deals for {len(channels)} channels ({waiting} waiting to post)")
             else:
                 logger.info("No new deals found")
+            CYCLE_SECONDS.observe(time.perf_counter() - cycle_started)
             
             # Cleanup old listings every 10 cycles
             if hasattr(self, '_cleanup_counter'):
@@ -218,7 +367,7 @@ class SneakerBot(discord.Client):
                 self._cleanup_counter = 1
                 
             if self._cleanup_counter >= 10:
-                self.cleanup_old_listings()
+                await self.cleanup_old_listings()
                 self._cleanup_counter = 0
                 
         except Exception as e:
@@ -232,17 +381,19 @@ class SneakerBot(discord.Client):
 
 def main():
     """Main function to run the bot"""
+    setup_logging()
     config = Config()
     
     if not config.DISCORD_TOKEN:
         logger.error("DISCORD_TOKEN not found in config. Please set it in config.json")
         return
     
-    if not config.DISCORD_CHANNEL_ID:
-        logger.error("DISCORD_CHANNEL_ID not found in config. Please set it in config.json")
-        return
+    for subscription in config.SUBSCRIPTIONS:
+        if not subscription['channel_id']:
+            logger.error(f"Discord channel ID is not set for subscription '{subscription['name']}'. Please set it in config.json")
+            return
     
-    bot = SneakerBot()
+    bot = SneakerBot(config)
     
     try:
         logger.info("Starting Sneaker Deal Sniper Bot...")
@@ -0,0 +1,313 @@
+import asyncio
+import json
+import sqlite3
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from cache_module import SeenCache
+from listing_module import listing_key
+
+logger = logging.getLogger(__name__)
+
+
+class ListingStore:
+    """Deduplication store backed by a single long-lived SQLite connection.
+
+    Listings are keyed by their integer eBay item ID (Listing.key), which
+    is the table's rowid, so lookups never compare URL strings.
+
+    Every query runs on a dedicated single-thread executor, so the event loop
+    never blocks on disk I/O and the connection is only ever touched by one
+    thread. Statements are kept as constant strings so sqlite3's statement
+    cache reuses the prepared versions across calls. A SeenCache in front of
+    the table keeps most lookups from reaching SQLite at all. When a
+    PriceIndex is attached, record_prices feeds it every unseen listing,
+    posted or not, counting each item ID once.
+    """
+
+    CREATE_LISTINGS = '''
+        CREATE TABLE IF NOT EXISTS listings (
+            item_id INTEGER PRIMARY KEY,
+            url TEXT,
+            title TEXT,
+            price REAL,
+            posted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    '''
+    CREATE_POSTED_AT_INDEX = 'CREATE INDEX IF NOT EXISTS idx_listings_posted_at ON listings (posted_at)'
+    CREATE_TERM_SCHEDULE = '''
+        CREATE TABLE IF NOT EXISTS term_schedule (
+            term TEXT PRIMARY KEY,
+            interval_seconds REAL,
+            next_due REAL
+        )
+    '''
+    CREATE_TERM_MARKERS = '''
+        CREATE TABLE IF NOT EXISTS term_markers (
+            term TEXT PRIMARY KEY,
+            urls TEXT
+        )
+    '''
+    CREATE_PRICE_BUCKETS = '''
+        CREATE TABLE IF NOT EXISTS price_buckets (
+            model TEXT,
+            day TEXT,
+            bucket INTEGER,
+            count INTEGER,
+            PRIMARY KEY (model, day, bucket)
+        )
+    '''
+    CREATE_INDEXED_LISTINGS = '''
+        CREATE TABLE IF NOT EXISTS indexed_listings (
+            item_id INTEGER PRIMARY KEY,
+            day TEXT
+        )
+    '''
+    SELECT_SEEN = 'SELECT item_id FROM listings WHERE item_id IN ({placeholders})'
+    INSERT_LISTING = 'INSERT OR IGNORE INTO listings (item_id, url, title, price) VALUES (?, ?, ?, ?)'
+    SELECT_ALL_KEYS = 'SELECT item_id FROM listings ORDER BY posted_at'
+    SELECT_LISTING_COLUMNS = 'PRAGMA table_info(listings)'
+    MIGRATE_SELECT_OLD = 'SELECT url, title, price, posted_at FROM listings_url_keyed ORDER BY id'
+    MIGRATE_INSERT = 'INSERT OR IGNORE INTO listings (item_id, url, title, price, posted_at) VALUES (?, ?, ?, ?, ?)'
+    DELETE_OLD = 'DELETE FROM listings WHERE posted_at < ?'
+    SELECT_TERM_SCHEDULE = 'SELECT term, interval_seconds, next_due FROM term_schedule'
+    UPSERT_TERM_SCHEDULE = 'INSERT OR REPLACE INTO term_schedule (term, interval_seconds, next_due) VALUES (?, ?, ?)'
+    SELECT_TERM_MARKERS = 'SELECT term, urls FROM term_markers'
+    UPSERT_TERM_MARKERS = 'INSERT OR REPLACE INTO term_markers (term, urls) VALUES (?, ?)'
+    SELECT_PRICE_BUCKETS = 'SELECT model, day, bucket, count FROM price_buckets WHERE day >= ?'
+    UPSERT_PRICE_BUCKET = '''
+        INSERT INTO price_buckets (model, day, bucket, count) VALUES (?, ?, ?, ?)
+        ON CONFLICT (model, day, bucket) DO UPDATE SET count = count + excluded.count
+    '''
+    DELETE_OLD_PRICE_BUCKETS = 'DELETE FROM price_buckets WHERE day < ?'
+    SELECT_INDEXED = 'SELECT item_id FROM indexed_listings WHERE item_id IN ({placeholders})'
+    INSERT_INDEXED = 'INSERT OR IGNORE INTO indexed_listings (item_id, day) VALUES (?, ?)'
+    DELETE_OLD_INDEXED = 'DELETE FROM indexed_listings WHERE day < ?'
+
+    # Stay well below SQLITE_MAX_VARIABLE_NUMBER on older SQLite builds
+    IN_CHUNK_SIZE = 500
+
+    def __init__(self, db_path='sneaker_deals.db', cache_capacity=100000, cache_lru_size=20000, price_index=None):
+        self.db_path = db_path
+        self.price_index = price_index
+        self.cache_capacity = cache_capacity
+        self.cache_lru_size = cache_lru_size
+        self.cache = SeenCache(cache_capacity, cache_lru_size)
+        self._conn = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='listing-store')
+
+    async def _run(self, func, *args):
+        """Run a blocking database call on the store's executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _connection(self):
+        """Return the open connection, creating it on first use"""
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._migrate_url_keys(conn)
+            conn.execute(self.CREATE_LISTINGS)
+            conn.execute(self.CREATE_POSTED_AT_INDEX)
+            conn.execute(self.CREATE_TERM_SCHEDULE)
+            conn.execute(self.CREATE_TERM_MARKERS)
+            conn.execute(self.CREATE_PRICE_BUCKETS)
+            conn.execute(self.CREATE_INDEXED_LISTINGS)
+            conn.commit()
+            self._conn = conn
+            logger.info("Database initialized")
+        return self._conn
+
+    def _migrate_url_keys(self, conn):
+        """Move a URL-keyed listings table onto integer item ID keys"""
+        columns = [row[1] for row in conn.execute(self.SELECT_LISTING_COLUMNS)]
+        if not columns or 'item_id' in columns:
+            return
+        with conn:
+            conn.execute('ALTER TABLE listings RENAME TO listings_url_keyed')
+            conn.execute(self.CREATE_LISTINGS)
+            rows = conn.execute(self.MIGRATE_SELECT_OLD).fetchall()
+            conn.executemany(self.MIGRATE_INSERT, (
+                (listing_key(url), url, title, price, posted_at) for url, title, price, posted_at in rows
+            ))
+            conn.execute('DROP TABLE listings_url_keyed')
+        logger.info(f"Migrated {len(rows)} listings to item ID keys")
+
+    def _select_keys(self, select, keys):
+        conn = self._connection()
+        found = set()
+        for start in range(0, len(keys), self.IN_CHUNK_SIZE):
+            chunk = keys[start:start + self.IN_CHUNK_SIZE]
+            query = select.format(placeholders=','.join('?' * len(chunk)))
+            found.update(row[0] for row in conn.execute(query, chunk))
+        return found
+
+    def _seen_many(self, keys):
+        return self._select_keys(self.SELECT_SEEN, keys)
+
+    def _claim_unindexed(self, keys, day):
+        """Mark keys as indexed and return those that were not already"""
+        conn = self._connection()
+        indexed = self._select_keys(self.SELECT_INDEXED, keys)
+        new_keys = [key for key in keys if key not in indexed]
+        with conn:
+            conn.executemany(self.INSERT_INDEXED, ((key, day) for key in new_keys))
+        return set(new_keys)
+
+    def _save_price_buckets(self, bucket_rows):
+        conn = self._connection()
+        with conn:
+            conn.executemany(self.UPSERT_PRICE_BUCKET, bucket_rows)
+
+    def _record_many(self, listings):
+        conn = self._connection()
+        rows = [(listing.key, listing.url, listing.title, listing.price) for listing in listings]
+        before = conn.total_changes
+        with conn:
+            conn.executemany(self.INSERT_LISTING, rows)
+            inserted = conn.total_changes - before
+        if inserted < len(rows):
+            logger.warning(f"Ignored {len(rows) - inserted} duplicate listings")
+        logger.info(f"Saved {inserted} listings")
+        return inserted
+
+    def _cleanup(self, days):
+        conn = self._connection()
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
+        cursor = conn.execute(self.DELETE_OLD, (cutoff_date.strftime('%Y-%m-%d %H:%M:%S'),))
+        conn.commit()
+        return cursor.rowcount
+
+    def _load_price_buckets(self, cutoff_day):
+        return self._connection().execute(self.SELECT_PRICE_BUCKETS, (cutoff_day,)).fetchall()
+
+    def _delete_price_buckets(self, cutoff_day):
+        conn = self._connection()
+        with conn:
+            conn.execute(self.DELETE_OLD_INDEXED, (cutoff_day,))
+            return conn.execute(self.DELETE_OLD_PRICE_BUCKETS, (cutoff_day,)).rowcount
+
+    def _load_term_schedule(self):
+        rows = self._connection().execute(self.SELECT_TERM_SCHEDULE)
+        return {term: (interval, next_due) for term, interval, next_due in rows}
+
+    def _save_term_schedule(self, rows):
+        conn = self._connection()
+        with conn:
+            conn.executemany(self.UPSERT_TERM_SCHEDULE, rows)
+
+    def _load_term_markers(self):
+        rows = self._connection().execute(self.SELECT_TERM_MARKERS)
+        # Markers saved before item ID keys were URLs; those are dropped
+        return {term: [key for key in json.loads(keys) if isinstance(key, int)] for term, keys in rows}
+
+    def _save_term_markers(self, rows):
+        conn = self._connection()
+        with conn:
+            conn.executemany(self.UPSERT_TERM_MARKERS, rows)
+
+    def _build_cache(self):
+        keys = [row[0] for row in self._connection().execute(self.SELECT_ALL_KEYS)]
+        return SeenCache.from_keys(keys, self.cache_capacity, self.cache_lru_size)
+
+    async def _warm_cache(self):
+        """Rebuild the front cache from the listings table"""
+        cache = await self._run(self._build_cache)
+        # Keep the running counters so hit rate covers the whole session
+        cache.lookups = self.cache.lookups
+        cache.lru_hits = self.cache.lru_hits
+        cache.bloom_negatives = self.cache.bloom_negatives
+        self.cache = cache
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    async def open(self):
+        """Open the connection and make sure the schema exists"""
+        await self._run(self._connection)
+        await self._warm_cache()
+        logger.info(f"Seen-listing cache warmed with {self.cache.bloom.count} listings")
+        if self.price_index is not None:
+            rows = await self._run(self._load_price_buckets, self.price_index.cutoff_day())
+            self.price_index.load(rows)
+            logger.info(f"Price index loaded for {self.price_index.stats()['models']} models")
+
+    async def seen_many(self, keys):
+        """Return the subset of listing keys that are already stored, in one pass"""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return set()
+        seen, maybe_new, _ = self.cache.partition(keys)
+        if maybe_new:
+            confirmed = await self._run(self._seen_many, maybe_new)
+            self.cache.confirm(confirmed)
+            seen |= confirmed
+        return seen
+
+    async def record_many(self, listings):
+        """Store listings in a single transaction and return how many were inserted"""
+        listings = list(listings)
+        if not listings:
+            return 0
+        inserted = await self._run(self._record_many, listings)
+        self.cache.add(listing.key for listing in listings)
+        return inserted
+
+    async def record_prices(self, listings):
+        """Feed listings the price index has not counted yet into it and return how many were added"""
+        if self.price_index is None:
+            return 0
+        listings = list({listing.key: listing for listing in listings}.values())
+        if not listings:
+            return 0
+        day = self.price_index.today()
+        new_keys = await self._run(self._claim_unindexed, [listing.key for listing in listings], day)
+        new_listings = [listing for listing in listings if listing.key in new_keys]
+        # Sketch updates are cheap and happen here so lookups never race the executor
+        bucket_rows = self.price_index.add_many(new_listings, day)
+        if bucket_rows:
+            await self._run(self._save_price_buckets, bucket_rows)
+        return len(new_listings)
+
+    async def cleanup(self, days=7):
+        """Remove listings older than the given number of days"""
+        deleted = await self._run(self._cleanup, days)
+        if deleted > 0:
+            logger.info(f"Cleaned up {deleted} old listings")
+            # Bloom filters cannot forget, so rebuild from what is left
+            await self._warm_cache()
+        if self.price_index is not None and self.price_index.expire():
+            await self._run(self._delete_price_buckets, self.price_index.cutoff_day())
+        return deleted
+
+    async def load_term_schedule(self):
+        """Return persisted polling state as {term: (interval, next_due)}"""
+        return await self._run(self._load_term_schedule)
+
+    async def save_term_schedule(self, rows):
+        """Persist (term, interval, next_due) polling rows"""
+        rows = list(rows)
+        if rows:
+            await self._run(self._save_term_schedule, rows)
+
+    async def load_term_markers(self):
+        """Return the newest listing keys seen per term as {term: [key, ...]}"""
+        return await self._run(self._load_term_markers)
+
+    async def save_term_markers(self, markers):
+        """Persist {term: [key, ...]} pagination markers"""
+        rows = [(term, json.dumps(keys)) for term, keys in markers.items()]
+        if rows:
+            await self._run(self._save_term_markers, rows)
+
+    def cache_stats(self):
+        """Return seen-listing cache hit rate and memory use"""
+        return self.cache.stats()
+
+    async def close(self):
+        """Close the connection and shut down the executor"""
+        await self._run(self._close)
+        self._executor.shutdown(wait=True)
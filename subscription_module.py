@@ -0,0 +1,115 @@
+from bisect import bisect_right
+
+
+class Subscription:
+    """One channel's filters: a price range, keywords and a minimum deal score"""
+
+    __slots__ = ('name', 'channel_id', 'min_price', 'max_price', 'include_keywords', 'exclude_keywords', 'min_score')
+
+    def __init__(self, name, channel_id, min_price=0, max_price=float('inf'), include_keywords=(),
+                 exclude_keywords=(), min_score=0):
+        self.name = name
+        self.channel_id = int(channel_id)
+        self.min_price = min_price
+        self.max_price = max_price
+        self.include_keywords = list(include_keywords)
+        self.exclude_keywords = list(exclude_keywords)
+        self.min_score = min_score
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data.get('name', str(data['channel_id'])),
+            data['channel_id'],
+            data.get('min_price', 0),
+            data.get('max_price', float('inf')),
+            data.get('include_keywords', ()),
+            data.get('exclude_keywords', ()),
+            data.get('min_score', 0),
+        )
+
+    def __repr__(self):
+        return f"Subscription({self.name!r}, channel={self.channel_id})"
+
+
+class SubscriptionIndex:
+    """Matches a listing against every subscription at once.
+
+    Each subscription is one bit. Keywords map to the bits that include or
+    exclude them (the tags go into the bot's KeywordEngine, so the title is
+    still scanned once), and the price axis is cut at every range boundary
+    into segments that each carry the bits of the ranges covering them. A
+    match is one bisect plus a few mask operations however many channels
+    are subscribed.
+    """
+
+    def __init__(self, subscriptions):
+        self.subscriptions = list(subscriptions)
+        self.all_mask = (1 << len(self.subscriptions)) - 1
+
+        # Subscriptions with an include list only match when one of their keywords does
+        self.needs_include = 0
+        for bit, subscription in enumerate(self.subscriptions):
+            if subscription.include_keywords:
+                self.needs_include |= 1 << bit
+
+        # Elementary price segments; segment i covers [bounds[i-1], bounds[i])
+        bounds = sorted({subscription.min_price for subscription in self.subscriptions}
+                        | {subscription.max_price for subscription in self.subscriptions})
+        self.bounds = bounds
+        self.segment_masks = []
+        for index in range(len(bounds) + 1):
+            low = bounds[index - 1] if index else float('-inf')
+            mask = 0
+            for bit, subscription in enumerate(self.subscriptions):
+                # The segment's upper end is another bound, so this covers all of it
+                if subscription.min_price <= low < subscription.max_price:
+                    mask |= 1 << bit
+            self.segment_masks.append(mask)
+        self.max_price_masks = {}
+        for bit, subscription in enumerate(self.subscriptions):
+            self.max_price_masks[subscription.max_price] = self.max_price_masks.get(subscription.max_price, 0) | 1 << bit
+
+    def keyword_tags(self):
+        """Return {keyword: {tag, ...}} for the KeywordEngine"""
+        keyword_tags = {}
+        for bit, subscription in enumerate(self.subscriptions):
+            for keyword in subscription.include_keywords:
+                keyword_tags.setdefault(keyword, set()).add(('sub_include', bit))
+            for keyword in subscription.exclude_keywords:
+                keyword_tags.setdefault(keyword, set()).add(('sub_exclude', bit))
+        return keyword_tags
+
+    def price_mask(self, price):
+        """Bits of the subscriptions whose price range contains price"""
+        index = bisect_right(self.bounds, price)
+        mask = self.segment_masks[index]
+        if index and self.bounds[index - 1] == price:
+            # Ranges are inclusive at both ends, like the original price filter
+            mask |= self.max_price_masks.get(price, 0)
+        return mask
+
+    def match_mask(self, price, tags):
+        """Bits of the subscriptions a listing with this price and these keyword tags matches"""
+        mask = self.price_mask(price)
+        if not mask:
+            return 0
+        included = excluded = 0
+        for tag in tags:
+            if type(tag) is tuple:
+                if tag[0] == 'sub_include':
+                    included |= 1 << tag[1]
+                elif tag[0] == 'sub_exclude':
+                    excluded |= 1 << tag[1]
+        return mask & (included | (self.all_mask & ~self.needs_include)) & ~excluded
+
+    def subscriptions_for(self, mask, score=None):
+        """Return the subscriptions in a match mask, dropping those whose min_score the score misses"""
+        found = []
+        while mask:
+            low_bit = mask & -mask
+            subscription = self.subscriptions[low_bit.bit_length() - 1]
+            if score is None or score >= subscription.min_score:
+                found.append(subscription)
+            mask ^= low_bit
+        return found
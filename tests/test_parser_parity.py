@@ -0,0 +1,33 @@
+import os
+import pytest
+
+from parser_module import PARSERS, check_parity, parse_streaming
+
+pytest.importorskip('lxml')
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'ebay_search_page.html')
+
+
+@pytest.fixture(scope='module')
+def search_page():
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def test_backends_and_streaming_agree(search_page):
+    assert check_parity(search_page) == []
+
+
+def test_reference_parser_skips_ads_and_bad_prices(search_page):
+    listings = PARSERS['html.parser']().parse(search_page)
+    titles = [listing.title for listing in listings]
+    assert len(listings) == 9
+    assert 'Shop on eBay' not in titles
+    assert not any('Patent Leather Bred' in title for title in titles)  # sponsored
+    assert not any('Syracuse' in title for title in titles)  # $0.00
+    assert all('?' not in listing.url for listing in listings)
+
+
+@pytest.mark.parametrize('chunk_size', [64, 1000, 1 << 20])
+def test_streaming_matches_at_any_chunk_size(search_page, chunk_size):
+    assert parse_streaming(search_page, chunk_size) == PARSERS['lxml']().parse(search_page)
@@ -0,0 +1,104 @@
+import time
+import asyncio
+
+from posting_module import DealPoster, DeferredEmbed
+
+
+class RateLimited(Exception):
+    status = 429
+
+    def __init__(self, retry_after):
+        super().__init__('429 Too Many Requests')
+        self.retry_after = retry_after
+
+
+class FakeChannel:
+    """Records each message's embeds; raises the queued errors first"""
+
+    def __init__(self, errors=()):
+        self.messages = []
+        self.attempts = 0
+        self.errors = list(errors)
+
+    async def send(self, embeds=()):
+        self.attempts += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        self.messages.append(list(embeds))
+
+
+async def post_all(poster, items):
+    poster.start()
+    for channel, embed in items:
+        poster.submit(channel, embed, str(embed))
+    await poster.stop(timeout=5)
+
+
+def test_batches_up_to_ten_embeds_per_message():
+    channel = FakeChannel()
+    poster = DealPoster()
+    asyncio.run(post_all(poster, [(channel, number) for number in range(23)]))
+
+    assert [len(message) for message in channel.messages] == [10, 10, 3]
+    assert [embed for message in channel.messages for embed in message] == list(range(23))
+    assert poster.messages_sent == 3
+    assert poster.deals_posted == 23
+
+
+def test_batches_never_mix_channels():
+    first, second = FakeChannel(), FakeChannel()
+    poster = DealPoster(max_embeds_per_message=4)
+    asyncio.run(post_all(poster, [(first, 1), (second, 2), (first, 3), (second, 4)]))
+
+    assert first.messages == [[1, 3]]
+    assert second.messages == [[2, 4]]
+
+
+def test_retries_the_same_batch_after_a_429():
+    channel = FakeChannel(errors=[RateLimited(0.05)])
+    poster = DealPoster()
+    began = time.monotonic()
+    asyncio.run(post_all(poster, [(channel, 'a'), (channel, 'b')]))
+    elapsed = time.monotonic() - began
+
+    assert channel.attempts == 2
+    assert channel.messages == [['a', 'b']]
+    assert elapsed >= 0.05
+    assert poster.deals_dropped == 0
+
+
+def test_other_errors_drop_the_batch():
+    channel = FakeChannel(errors=[RuntimeError('boom')])
+    poster = DealPoster()
+    asyncio.run(post_all(poster, [(channel, 'a')]))
+
+    assert channel.messages == []
+    assert poster.deals_dropped == 1
+
+
+def test_full_queue_drops_new_deals():
+    async def fill():
+        poster = DealPoster(max_queue_size=2)
+        channel = FakeChannel()
+        accepted = [poster.submit(channel, number) for number in range(5)]
+        return poster, accepted
+
+    poster, accepted = asyncio.run(fill())
+    assert accepted == [True, True, False, False, False]
+    assert poster.deals_dropped == 3
+    assert poster.depth == 2
+
+
+def test_deferred_embeds_are_built_once_when_sent():
+    builds = []
+
+    def build(number):
+        builds.append(number)
+        return f'embed {number}'
+
+    embed = DeferredEmbed(build, 7)
+    first, second = FakeChannel(), FakeChannel()
+    asyncio.run(post_all(DealPoster(), [(first, embed), (second, embed)]))
+
+    assert builds == [7]
+    assert first.messages == [['embed 7']] and second.messages == [['embed 7']]
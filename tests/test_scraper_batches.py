@@ -0,0 +1,55 @@
+import asyncio
+
+from listing_module import Listing
+from scraper_module import SneakerScraper
+
+
+def listing(item_id, title="Nike Dunk Low"):
+    return Listing(f"{title} #{item_id}", 100.0, 'New', 'Leather', f"https://www.ebay.com/itm/{item_id}", None)
+
+
+def make_scraper(delays, results):
+    """A scraper whose queries take delays[query] seconds and return results[query]"""
+    scraper = SneakerScraper(list(delays), share_overlapping_terms=False)
+
+    async def scrape_search_term(session, search_term, limit):
+        await asyncio.sleep(delays[search_term])
+        if isinstance(results[search_term], Exception):
+            raise results[search_term]
+        items = [listing(item_id) for item_id in results[search_term]]
+        for item in items:
+            item.search_term = search_term
+        return items
+
+    scraper.scrape_search_term = scrape_search_term
+    return scraper
+
+
+async def collect(scraper):
+    batches = []
+    started = asyncio.get_running_loop().time()
+    try:
+        async for batch in scraper.scrape_batches(interval_seconds=60):
+            batches.append((asyncio.get_running_loop().time() - started, [item.key for item in batch]))
+    finally:
+        await scraper.close()
+    return batches
+
+
+def test_batches_arrive_as_each_query_finishes():
+    scraper = make_scraper({'Slow': 0.3, 'Fast': 0.0}, {'Slow': [3, 4], 'Fast': [1, 2]})
+    batches = asyncio.run(collect(scraper))
+    assert [keys for _, keys in batches] == [[1, 2], [3, 4]]
+    assert batches[0][0] < 0.2
+
+
+def test_listings_found_by_several_queries_are_yielded_once():
+    scraper = make_scraper({'Dunk': 0.0, 'Dunk Low': 0.05}, {'Dunk': [1, 2], 'Dunk Low': [2, 3]})
+    batches = asyncio.run(collect(scraper))
+    assert [keys for _, keys in batches] == [[1, 2], [3]]
+
+
+def test_failed_query_does_not_stop_the_others():
+    scraper = make_scraper({'Broken': 0.0, 'Dunk': 0.05}, {'Broken': RuntimeError("boom"), 'Dunk': [1]})
+    batches = asyncio.run(collect(scraper))
+    assert [keys for _, keys in batches] == [[], [1]]
@@ -0,0 +1,62 @@
+import asyncio
+
+from listing_module import Listing
+from scraper_module import SneakerScraper
+
+ITEMS_PER_PAGE = 5
+
+
+def listing(item_id):
+    return Listing(f"Air Jordan 1 #{item_id}", 100.0, 'New', 'Leather', f"https://www.ebay.com/itm/{item_id}", None)
+
+
+class FakeResults:
+    """Newest-first search results served in pages, in place of eBay"""
+
+    def __init__(self, item_ids):
+        self.item_ids = list(item_ids)
+        self.pages_fetched = 0
+
+    async def iter_page_listings(self, session, url, skip_unchanged=True):
+        page = int(url.split('_pgn=')[1].split('&')[0]) if '_pgn=' in url else 1
+        self.pages_fetched += 1
+        for item_id in self.item_ids[(page - 1) * ITEMS_PER_PAGE:page * ITEMS_PER_PAGE]:
+            yield listing(item_id)
+
+
+def poll(scraper, results):
+    results.pages_fetched = 0
+    return asyncio.run(scraper.scrape_search_term(None, 'Jordan 1', limit=ITEMS_PER_PAGE))
+
+
+def make_scraper(results):
+    scraper = SneakerScraper(['Jordan 1'], items_per_page=ITEMS_PER_PAGE, max_pages=5)
+    scraper.iter_page_listings = results.iter_page_listings
+    return scraper
+
+
+def test_quiet_polls_keep_older_markers():
+    results = FakeResults(range(100, 75, -1))
+    scraper = make_scraper(results)
+    assert [item.key for item in poll(scraper, results)] == [100, 99, 98, 97, 96]
+
+    results.item_ids.insert(0, 101)
+    assert [item.key for item in poll(scraper, results)] == [101]
+    assert poll(scraper, results) == []
+    assert poll(scraper, results) == []
+    assert scraper.term_markers['Jordan 1'][:3] == [101, 100, 99]
+    assert len(scraper.term_markers['Jordan 1']) <= scraper.MARKER_COUNT
+
+
+def test_removed_newest_listing_does_not_replay_old_results():
+    results = FakeResults(range(100, 75, -1))
+    scraper = make_scraper(results)
+    poll(scraper, results)
+    results.item_ids.insert(0, 101)
+    poll(scraper, results)
+    poll(scraper, results)
+
+    # The newest listing sells and drops out of the results
+    results.item_ids.remove(101)
+    assert poll(scraper, results) == []
+    assert results.pages_fetched == 1